@@ -1,11 +1,16 @@
+import time
 from typing import TYPE_CHECKING
 
+from asgiref.sync import async_to_sync
 from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.utils.html import format_html_join
 from django.utils.translation import gettext_lazy as _
+from student_schedule_bot.config import config
 
 from bot.admin.base import BaseAdmin
 from bot.models.telegram.bot import Bot
-from bot.operations.telegram.webhook import set_webhook
+from bot.operations.telegram.webhook import get_webhook_info, set_webhooks
 
 if TYPE_CHECKING:
     from django.db.models.query import QuerySet
@@ -26,11 +31,20 @@ class TelegramBotAdmin(BaseAdmin):
                 ]
             },
         ),
+        (
+            _("Webhook"),
+            {
+                "fields": [
+                    "webhook_status",
+                ]
+            },
+        ),
     ]
 
     readonly_fields = [
         *BaseAdmin.readonly_fields,
         "secret_key",
+        "webhook_status",
     ]
 
     list_display = [
@@ -46,6 +60,31 @@ class TelegramBotAdmin(BaseAdmin):
         """Returns a shortened version of the token."""
         return f"{obj.token[:5]}...{obj.token[-5:]}" if obj.token else ""
 
+    @admin.display(description=_("Webhook status"))
+    def webhook_status(self, obj: "Bot") -> str:
+        """Shows the webhook as Telegram reports it (asked on every page load)."""
+        if obj.pk is None or not obj.token:
+            return "-"
+
+        webhook_info = get_webhook_info(obj)
+
+        if webhook_info is None:
+            return _("Failed to get webhook info. Check logs for details.")
+
+        last_error = "-"
+        if webhook_info.last_error_message:
+            last_error = f"{webhook_info.last_error_message} ({webhook_info.last_error_date})"
+
+        rows = [
+            (_("URL matches"), webhook_info.url == obj.full_webhook_url),
+            (_("Pending updates"), webhook_info.pending_update_count),
+            (_("Last error"), last_error),
+            (_("Max connections"), webhook_info.max_connections),
+            (_("Allowed updates"), ", ".join(webhook_info.allowed_updates or ()) or _("all")),
+        ]
+
+        return format_html_join("\n", "{}: {}<br>", rows)
+
     actions = [*BaseAdmin.actions, "set_webhook_url"]
 
     @admin.action(description=_("Set webhook URL for selected bots"))
@@ -53,22 +92,42 @@ class TelegramBotAdmin(BaseAdmin):
         self,
         request,  # noqa: ANN001
         queryset: "QuerySet[Bot]",
-    ) -> None:
-        """Action to set the webhook URL for selected bots."""
-        for bot in queryset:
-            result = set_webhook(bot)
-
-            if not result:
-                self.message_user(
-                    request,
-                    _("Failed to set webhook for bot: {bot_name}. Check logs for details.").format(
-                        bot_name=bot.name,
-                    ),
-                    level="error",
-                )
-
-        self.message_user(
+    ) -> TemplateResponse:
+        """Action to set the webhook URL for selected bots, concurrently. Shows a result per bot."""
+        started_at = time.monotonic()
+
+        results = async_to_sync(set_webhooks)(
+            list(queryset),
+            concurrency=config.TELEGRAM_WEBHOOK_REGISTRATION_CONCURRENCY,
+        )
+
+        duration = time.monotonic() - started_at
+        failed = sum(not result.ok for result in results)
+
+        if failed:
+            self.message_user(
+                request,
+                _("Failed to set webhook for {failed} of {total} bots. Check logs for details.").format(
+                    failed=failed,
+                    total=len(results),
+                ),
+                level="error",
+            )
+        else:
+            self.message_user(
+                request,
+                _("Webhook URL set for selected bots."),
+                level="success",
+            )
+
+        return TemplateResponse(
             request,
-            _("Webhook URL set for selected bots."),
-            level="success",
+            "admin/bot/bot/set_webhook_results.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": _("Webhook results"),
+                "opts": self.model._meta,  # noqa: SLF001
+                "results": results,
+                "duration": duration,
+            },
         )
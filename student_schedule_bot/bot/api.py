@@ -1,13 +1,20 @@
-import json
-
 import pydantic
-from django.http import HttpRequest
-from ninja import NinjaAPI, Schema
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from ninja import NinjaAPI
+from ninja.security import django_auth_superuser
+from student_schedule_bot.config import config
+from student_schedule_bot.logger import main_logger
 
 from bot.dependencies.telegram import get_bot as get_bot_instance
-from bot.operations.telegram.bot import process_webhook_with_bot
+from bot.errors.http import LoggedHTTPError
+from bot.operations.schedule.cache import cache_stats
+from bot.operations.telegram.bot import process_webhook_with_bot, update_stats
+from bot.operations.telegram.ingestion import parse_update
+from bot.operations.telegram.messages import render_cache
+from bot.operations.telegram.queue import update_queue
+from bot.operations.telegram.rate_limiter import rate_limit_stats
+from bot.schemas.metrics import MetricsResponse
 from bot.schemas.telegram import TelegramWebhookResponse
-from student_schedule_bot.logger import main_logger
 
 api = NinjaAPI(
     title="Student Schedule Bot API",
@@ -15,18 +22,26 @@ api = NinjaAPI(
 )
 
 
-class BlankBody(Schema):
-    pass
+@api.exception_handler(LoggedHTTPError)
+def logged_http_error_handler(
+    request: HttpRequest,
+    exc: LoggedHTTPError,
+) -> HttpResponse:
+    return api.create_response(
+        request,
+        exc.message,
+        status=exc.status_code,
+    )
 
 
-@api.post("/webhook/telegram/{bot_id}/{secret_key}")
+@api.post("/webhook/telegram/{bot_id}/{secret_key}", response=TelegramWebhookResponse)
 async def telegram_webhook(
     request: HttpRequest,
     # Technically it's a WSGIRequest, but it's compatible with HttpRequest
     bot_id: pydantic.UUID4,
     secret_key: str,
-    body: BlankBody,  # noqa: ARG001
-) -> TelegramWebhookResponse:
+) -> TelegramWebhookResponse | JsonResponse:
+    # The body isn't declared as a parameter, so ninja doesn't parse it, it's decoded once by `parse_update`
     bot_instance = await get_bot_instance(
         bot_id=bot_id,
         secret_key=secret_key,
@@ -40,11 +55,36 @@ async def telegram_webhook(
         }
     )
 
-    await process_webhook_with_bot(
+    update_data = parse_update(request.body)
+
+    if update_data is None:
+        update_stats.ignored += 1
+    elif config.TELEGRAM_UPDATE_QUEUE_ENABLED:
+        await update_queue.put(
+            bot_instance=bot_instance,
+            update_data=update_data,
+        )
+    elif reply := await process_webhook_with_bot(
         bot_instance=bot_instance,
-        update_data=json.loads(request.body),
-    )
+        update_data=update_data,
+        reply_in_response=True,
+    ):
+        return JsonResponse(reply)
 
     return TelegramWebhookResponse(
         status="OK",
     )
+
+
+@api.get("/metrics", auth=django_auth_superuser)
+def metrics(
+    request: HttpRequest,  # noqa: ARG001
+) -> MetricsResponse:
+    # Sync on purpose: session auth touches the database
+    return MetricsResponse(
+        updates=update_stats.model_copy(),
+        update_queue=update_queue.get_stats(),
+        schedule_cache=cache_stats.as_dict(),
+        render_cache=render_cache.as_dict(),
+        rate_limit=rate_limit_stats.model_copy(),
+    )
@@ -6,3 +6,7 @@ class BotConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bot"
     verbose_name = _("Student Schedule Bot")
+
+    def ready(self) -> None:
+        # Connects signal receivers
+        from bot import signals  # noqa: F401, PLC0415
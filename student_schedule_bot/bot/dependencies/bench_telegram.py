@@ -0,0 +1,45 @@
+import asyncio
+import secrets
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bot.dependencies.telegram import bot_cache, get_bot
+from bot.models.telegram.bot import Bot
+
+if TYPE_CHECKING:
+    from conftest import Benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture
+def bot(django_db: None) -> Bot:  # noqa: ARG001
+    return Bot.objects.create(
+        name="benchmark",
+        token="1:benchmark",
+        secret_key=secrets.token_urlsafe(32),
+    )
+
+
+def test_webhook_auth(bot: Bot, benchmark: "Benchmark") -> None:
+    async def authenticate_cold() -> None:
+        bot_cache.invalidate()
+        await get_bot(bot.uuid, bot.secret_key)
+
+    async def authenticate_warm() -> None:
+        await get_bot(bot.uuid, bot.secret_key)
+
+    async def run() -> tuple[float, float]:
+        cold = await benchmark.measure_async("webhook auth: cold cache", authenticate_cold)
+        warm = await benchmark.measure_async("webhook auth: warm cache", authenticate_warm)
+
+        return cold, warm
+
+    try:
+        cold, warm = asyncio.run(run())
+    finally:
+        bot.delete()
+
+    # A warm cache skips the database query, and so the thread hop of the async ORM
+    assert warm < cold / 10
@@ -1,16 +1,60 @@
+import secrets
+import time
+
 import pydantic
+from student_schedule_bot.config import config
 
 from bot.errors.http import AuthorizationError
 from bot.models.telegram.bot import Bot
 
 
+class BotCache:
+    """
+    Process-local cache of `Bot` rows, so webhooks don't need a database query to be authenticated.
+
+    Entries expire after `ttl` seconds and are dropped right away when a Bot is saved or deleted in this process
+    (see `bot.signals`), the TTL bounds how long other processes may use outdated credentials.
+    Unknown ids are not cached, so random ids can't fill it up.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._bots: dict[str, tuple[float, Bot]] = {}
+
+    async def get(self, bot_id: pydantic.UUID4) -> Bot | None:
+        key = str(bot_id)
+
+        stored = self._bots.get(key)
+        if stored is not None and stored[0] > time.monotonic():
+            return stored[1]
+
+        bot = await Bot.objects.filter(
+            uuid=bot_id,
+        ).afirst()
+
+        if bot is None:
+            self._bots.pop(key, None)
+        elif self.ttl > 0:
+            self._bots[key] = (time.monotonic() + self.ttl, bot)
+
+        return bot
+
+    def invalidate(self, bot_id: pydantic.UUID4 | str | None = None) -> None:
+        """Drops the given bot from the cache, or every bot if no id is given."""
+        if bot_id is None:
+            self._bots.clear()
+        else:
+            self._bots.pop(str(bot_id), None)
+
+
+bot_cache = BotCache(ttl=config.TELEGRAM_BOT_CACHE_TTL)
+
+
 async def get_bot(
     bot_id: pydantic.UUID4,
     secret_key: str,
 ) -> Bot:
-    bot = await Bot.objects.filter(
-        uuid=bot_id,
-    ).afirst()
+    bot = await bot_cache.get(bot_id)
 
     if not bot:
         raise AuthorizationError(
@@ -20,7 +64,7 @@ async def get_bot(
             }
         )
 
-    if bot.secret_key != secret_key:
+    if not secrets.compare_digest(bot.secret_key.encode(), secret_key.encode()):
         raise AuthorizationError(
             log_message={
                 "msg": "Invalid secret key",
@@ -70,3 +70,10 @@ class NotFoundError(LoggedHTTPError):
         "msg": "Resource not found",
     }
     STATUS_CODE = 404
+
+
+class ServiceUnavailableError(LoggedHTTPError):
+    DEFAULT_MESSAGE = {
+        "msg": "Service is temporarily unavailable",
+    }
+    STATUS_CODE = 503
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from student_schedule_bot.config import config
+
+from bot.models.telegram.bot import Bot
+from bot.operations.telegram.webhook import set_webhooks
+
+
+class Command(BaseCommand):
+    help = "Sets webhooks of all bots (or the given ones) concurrently, e.g. during deploys."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Names of the bots to set webhooks for. All bots with a webhook URL if not given.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=config.TELEGRAM_WEBHOOK_REGISTRATION_CONCURRENCY,
+            help="Maximum number of bots to set webhooks for at once.",
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        asyncio.run(self.set_webhooks(**options))
+
+    async def set_webhooks(
+        self,
+        names: list[str],
+        concurrency: int,
+        **_options,  # noqa: ANN003
+    ) -> None:
+        queryset = Bot.objects.filter(name__in=names) if names else Bot.objects.exclude(webhook_url="")
+        bots = await sync_to_async(list)(queryset.order_by("name"))
+
+        if missing := set(names) - {bot.name for bot in bots}:
+            raise CommandError(f"Unknown bots: {', '.join(sorted(missing))}")
+
+        started_at = time.monotonic()
+        results = await set_webhooks(bots, concurrency=concurrency)
+        duration = time.monotonic() - started_at
+
+        for result in results:
+            line = f"{result.bot_name}: {result.duration:.2f}s, pending updates: {result.pending_update_count}"
+
+            if result.last_error_message:
+                line += f", last error: {result.last_error_message}"
+
+            if result.ok:
+                self.stdout.write(self.style.SUCCESS(f"OK     {line}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"FAILED {line}, error: {result.error}"))
+
+        failed = sum(not result.ok for result in results)
+
+        if failed:
+            raise CommandError(f"Failed to set webhooks for {failed} of {len(results)} bot(s) in {duration:.2f}s")
+
+        self.stdout.write(self.style.SUCCESS(f"Set webhooks for {len(results)} bot(s) in {duration:.2f}s"))
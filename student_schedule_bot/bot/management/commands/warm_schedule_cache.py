@@ -0,0 +1,66 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandParser
+from student_schedule_bot.config import config
+
+from bot.operations.schedule.warmup import warm_schedule_cache
+
+
+class Command(BaseCommand):
+    help = "Pre-populates the schedule list, item and photo caches. Repeats every --interval seconds if given."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=config.SCHEDULE_WARMUP_DAYS,
+            help="How many upcoming days to fetch photo schedules for.",
+        )
+        parser.add_argument(
+            "--max-pages",
+            type=int,
+            default=config.SCHEDULE_WARMUP_MAX_PAGES,
+            help="Maximum number of schedule pages to fetch.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=config.SCHEDULE_WARMUP_CONCURRENCY,
+            help="Maximum number of concurrent backend requests.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help=f"Refresh interval in seconds (e.g. {config.SCHEDULE_WARMUP_INTERVAL}). Runs once if not set.",
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        asyncio.run(self.warm_up(**options))
+
+    async def warm_up(
+        self,
+        days: int,
+        max_pages: int,
+        concurrency: int,
+        interval: int | None,
+        **_options,  # noqa: ANN003
+    ) -> None:
+        while True:
+            result = await warm_schedule_cache(
+                days=days,
+                max_pages=max_pages,
+                concurrency=concurrency,
+            )
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Warmed up {result.pages} page(s), {result.items} item(s), {result.photos} photo schedule(s) "
+                    f"in {result.duration:.2f}s ({result.failed} failed)"
+                )
+            )
+
+            if interval is None:
+                return
+
+            await asyncio.sleep(interval)
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:49
+
+import django.core.serializers.json
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0003_bot_secret_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersistenceRecord',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('kind', models.CharField(choices=[('user_data', 'User Data'), ('chat_data', 'Chat Data'), ('bot_data', 'Bot Data'), ('callback_data', 'Callback Data'), ('conversation', 'Conversation')], max_length=32, verbose_name='Kind')),
+                ('key', models.CharField(help_text='Chat ID, User ID or conversation name, depending on the kind of the record.', max_length=255, verbose_name='Key')),
+                ('data', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Data')),
+                ('bot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='persistence_records', to='bot.bot', verbose_name='Bot')),
+            ],
+            options={
+                'verbose_name': 'Persistence Record',
+                'verbose_name_plural': 'Persistence Records',
+                'ordering': ['-created_at'],
+                'get_latest_by': 'created_at',
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('bot', 'kind', 'key'), name='unique_persistence_record')],
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
-from . import bot, chat
+from . import bot, chat, persistence
 
 __all__ = [
     "bot",
     "chat",
+    "persistence",
 ]
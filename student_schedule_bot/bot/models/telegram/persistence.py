@@ -0,0 +1,50 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from bot.models.base import BaseModel
+from bot.models.telegram.bot import Bot
+
+
+class PersistenceRecord(BaseModel):
+    class Kind(models.TextChoices):
+        USER_DATA = "user_data", _("User Data")
+        CHAT_DATA = "chat_data", _("Chat Data")
+        BOT_DATA = "bot_data", _("Bot Data")
+        CALLBACK_DATA = "callback_data", _("Callback Data")
+        CONVERSATION = "conversation", _("Conversation")
+
+    bot = models.ForeignKey(
+        Bot,
+        verbose_name=_("Bot"),
+        on_delete=models.CASCADE,
+        related_name="persistence_records",
+    )
+
+    kind = models.CharField(
+        verbose_name=_("Kind"),
+        max_length=32,
+        choices=Kind.choices,
+    )
+    key = models.CharField(
+        verbose_name=_("Key"),
+        max_length=255,
+        help_text=_("Chat ID, User ID or conversation name, depending on the kind of the record."),
+    )
+
+    data = models.JSONField(
+        verbose_name=_("Data"),
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+    )
+
+    class Meta(BaseModel.Meta):
+        verbose_name = _("Persistence Record")
+        verbose_name_plural = _("Persistence Records")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bot", "kind", "key"],
+                name="unique_persistence_record",
+            ),
+        ]
@@ -0,0 +1,37 @@
+import datetime as dt
+import uuid
+
+from bot.schemas.schedule.schedule import ScheduleResponse
+
+BACKEND_URL = "http://backend/api"
+
+
+def make_schedule_response(count: int, groups: int = 3) -> ScheduleResponse:
+    """Returns a page of `count` schedules, shaped like the backend's."""
+    created_at = dt.datetime(2025, 10, 1, 10, tzinfo=dt.UTC)
+
+    return ScheduleResponse.model_validate(
+        {
+            "count": count * 3,
+            "next": f"{BACKEND_URL}/schedule/?page=2",
+            "previous": None,
+            "results": [
+                {
+                    "url": f"{BACKEND_URL}/schedule/{schedule_id}/",
+                    "uuid": schedule_id,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "for_date": created_at.date() + dt.timedelta(days=number % 7),
+                    "photo_schedule": f"{BACKEND_URL}/photo-schedule/{uuid.uuid4()}/",
+                    "group_schedules": [
+                        {
+                            "url": f"{BACKEND_URL}/group-schedule/{group_id}/",
+                            "uuid": group_id,
+                        }
+                        for group_id in (uuid.uuid4() for _ in range(groups))
+                    ],
+                }
+                for number, schedule_id in enumerate(uuid.uuid4() for _ in range(count))
+            ],
+        }
+    )
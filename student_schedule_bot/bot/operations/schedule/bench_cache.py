@@ -0,0 +1,64 @@
+import asyncio
+import pickle
+from typing import TYPE_CHECKING
+
+import pytest
+from django.core.cache import cache
+
+from bot.operations.conftest import make_schedule_response
+from bot.operations.schedule.cache import ResourceCache, SingleFlight
+from bot.schemas.schedule.schedule import ScheduleResponse
+
+if TYPE_CHECKING:
+    import httpx
+    from conftest import Benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+async def fetch(headers: dict[str, str]) -> "httpx.Response":  # noqa: ARG001
+    raise AssertionError("Hits must not reach the backend")
+
+
+@pytest.mark.parametrize("count", [10, 50, 200])
+def test_hit(count: int, benchmark: "Benchmark") -> None:
+    schedule = make_schedule_response(count)
+    schedules = ResourceCache(
+        "list",
+        ScheduleResponse,
+        "Failed to get schedule",
+        ttl=60,
+        max_stale=60,
+        negative_ttl=30,
+        stale_while_revalidate=True,
+        compress=True,
+        single_flight=SingleFlight(),
+    )
+
+    schedules.set("entry", schedule)
+    # What was stored before: the model itself, validated again on every hit
+    cache.set("model", schedule)
+
+    entry_size = len(pickle.dumps(cache.get("entry")))
+    model_size = len(pickle.dumps(schedule))
+
+    benchmark.report(f"schedule cache: {count} results, pickled model", model_size, "bytes")
+    benchmark.report(f"schedule cache: {count} results, JSON entry", entry_size, "bytes")
+
+    benchmark.measure(
+        f"schedule cache: {count} results, hit of a pickled model",
+        lambda: ScheduleResponse.model_validate(cache.get("model")),
+        number=20,
+    )
+
+    async def run() -> None:
+        await benchmark.measure_async(
+            f"schedule cache: {count} results, hit of a JSON entry",
+            lambda: schedules.get("entry", fetch),
+            number=20,
+        )
+
+    asyncio.run(run())
+
+    assert asyncio.run(schedules.get("entry", fetch)) == schedule
+    assert entry_size < model_size
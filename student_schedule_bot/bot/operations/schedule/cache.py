@@ -0,0 +1,415 @@
+import asyncio
+import hashlib
+import json
+import time
+import zlib
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Generic, Literal, NamedTuple, TypeVar
+
+import pydantic
+from django.core.cache import cache
+from libs.requests.status_codes import NOT_FOUND_404, NOT_MODIFIED_304, OK_200
+from student_schedule_bot.logger import main_logger
+
+from bot.operations.telegram.timings import create_detached_task
+
+if TYPE_CHECKING:
+    import httpx
+
+CacheResource = Literal["list", "item", "photo"]
+
+ResultType = TypeVar("ResultType")
+ModelType = TypeVar("ModelType", bound=pydantic.BaseModel)
+
+# Payloads smaller than this are not worth compressing
+COMPRESSION_THRESHOLD = 1024
+
+# Receives conditional request headers, returns the backend response
+FetchFunction = Callable[[dict[str, str]], Awaitable["httpx.Response"]]
+
+
+def make_cache_key(
+    prefix: str,
+    filters: "pydantic.BaseModel | None" = None,
+    scope: str | None = None,
+) -> str:
+    """
+    Builds a cache key that only depends on the given filters (and an optional scope).
+
+    Filters are normalized, so that unset fields and field order don't produce different keys.
+    Scope is meant for data that is not shared between users (e.g. per-group schedules).
+    """
+    key = prefix
+
+    if scope:
+        key = f"{key}_{scope}"
+
+    if filters is not None:
+        normalized = json.dumps(
+            filters.model_dump(mode="json", exclude_none=True),
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        key = f"{key}_{hashlib.sha256(normalized.encode()).hexdigest()[:32]}"
+
+    return key
+
+
+class CacheStats:
+    """In-process hit/miss counters of the schedule cache."""
+
+    def __init__(self) -> None:
+        self.hits: Counter[str] = Counter()
+        self.stale_hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self.not_modified: Counter[str] = Counter()
+
+    def hit(self, resource: CacheResource) -> None:
+        self.hits[resource] += 1
+
+    def stale_hit(self, resource: CacheResource) -> None:
+        self.stale_hits[resource] += 1
+
+    def revalidated(self, resource: CacheResource) -> None:
+        self.not_modified[resource] += 1
+
+    def miss(self, resource: CacheResource) -> None:
+        self.misses[resource] += 1
+
+        main_logger.debug(
+            {
+                "msg": "Schedule cache miss",
+                "resource": resource,
+                "stats": self.as_dict(),
+            }
+        )
+
+    def hit_rate(self, resource: CacheResource) -> float:
+        hits = self.hits[resource] + self.stale_hits[resource]
+        total = hits + self.misses[resource]
+        return hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        return {
+            resource: {
+                "hits": self.hits[resource],
+                "stale_hits": self.stale_hits[resource],
+                "misses": self.misses[resource],
+                "not_modified": self.not_modified[resource],
+                "hit_rate": self.hit_rate(resource),
+            }
+            for resource in ("list", "item", "photo")
+        }
+
+
+cache_stats = CacheStats()
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls with the same key.
+
+    The first caller starts the call, everyone else arriving before it finishes awaits the same result
+    (or exception). The call runs as a separate task, so a cancelled caller doesn't cancel it for the rest,
+    and outside of the caller's update, which it may outlive.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self,
+        key: str,
+        function: Callable[[], Awaitable[ResultType]],
+    ) -> ResultType:
+        task = self._calls.get(key)
+
+        if task is None:
+            task = create_detached_task(function())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        return await asyncio.shield(task)
+
+
+class ScheduleNotFoundError(RuntimeError):
+    """Raised when the backend doesn't have the resource. Such results are cached too."""
+
+
+def check_response(
+    response: "httpx.Response",
+    message: str,
+) -> None:
+    if response.status_code == OK_200:
+        return
+
+    error_class = ScheduleNotFoundError if response.status_code == NOT_FOUND_404 else RuntimeError
+
+    raise error_class(
+        {
+            "msg": message,
+            "response": response,
+            "response.content": response.content,
+            "response.request.url": response.request.url,
+        }
+    )
+
+
+class CacheEntry(NamedTuple):
+    """
+    What is actually stored in the cache.
+
+    Models are kept as their (optionally zlib-compressed) JSON, which is a lot smaller than a pickled model
+    and is turned back into one by pydantic-core without going through Python objects first.
+    `payload` is None for cached "not found" results.
+    Validators (ETag/Last-Modified) of the response are kept to revalidate the entry with a conditional request.
+    """
+
+    payload: bytes | None
+    compressed: bool
+
+    fresh_until: float
+    stale_until: float
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    @property
+    def not_found(self) -> bool:
+        return self.payload is None
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+    @property
+    def is_usable(self) -> bool:
+        return time.time() < self.stale_until
+
+
+class ResourceCache(Generic[ModelType]):  # noqa: UP046
+    """
+    Cache of one kind of schedule resource (list, item or photo).
+
+    - Fresh entries (younger than `ttl`) are returned as is.
+    - Stale entries (up to `max_stale` older than that) are returned right away and refreshed in the background,
+      if `stale_while_revalidate` is on. Otherwise they are refreshed in place, and only used if the backend fails.
+    - `ScheduleNotFoundError` is cached for `negative_ttl`, so missing resources don't hit the backend every time.
+    - Refreshes are conditional requests, a `304 Not Modified` extends the entry without parsing anything.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        resource: CacheResource,
+        schema: type[ModelType],
+        error_message: str,
+        *,
+        ttl: int,
+        max_stale: int,
+        negative_ttl: int,
+        stale_while_revalidate: bool,
+        compress: bool,
+        single_flight: "SingleFlight",
+    ) -> None:
+        self.resource = resource
+        self.schema = schema
+        self.error_message = error_message
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.negative_ttl = negative_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.compress = compress
+        self.single_flight = single_flight
+
+        self._background_tasks: set[asyncio.Task] = set()
+
+    def encode(self, value: ModelType) -> tuple[bytes, bool]:
+        payload = value.model_dump_json().encode()
+
+        if self.compress and len(payload) >= COMPRESSION_THRESHOLD:
+            return zlib.compress(payload, level=1), True
+
+        return payload, False
+
+    def decode(self, entry: CacheEntry) -> ModelType:
+        assert entry.payload is not None
+
+        payload = zlib.decompress(entry.payload) if entry.compressed else entry.payload
+
+        # The payload was produced from a validated model, so this only rebuilds it
+        return self.schema.model_validate_json(payload)
+
+    async def get(
+        self,
+        key: str,
+        fetch: FetchFunction,
+        *,
+        force_refresh: bool = False,
+    ) -> ModelType:
+        entry: CacheEntry | None = cache.get(key, default=None)
+
+        if force_refresh:
+            return await self.single_flight.do(key, lambda: self._fetch_and_store(key, fetch, entry))
+
+        if entry is not None and entry.is_fresh:
+            cache_stats.hit(self.resource)
+
+            if entry.not_found:
+                raise ScheduleNotFoundError({"msg": "Resource not found (cached)", "key": key})
+
+            return self.decode(entry)
+
+        if entry is not None and not entry.not_found and entry.is_usable and self.stale_while_revalidate:
+            cache_stats.stale_hit(self.resource)
+            self._refresh_in_background(key, fetch, entry)
+            return self.decode(entry)
+
+        cache_stats.miss(self.resource)
+
+        try:
+            return await self.single_flight.do(key, lambda: self._fetch_and_store(key, fetch, entry))
+        except ScheduleNotFoundError:
+            raise
+        except Exception as e:
+            if entry is None or entry.not_found or not entry.is_usable:
+                raise
+
+            main_logger.warning(
+                {
+                    "msg": "Failed to refresh schedule cache, serving stale data",
+                    "key": key,
+                    "error": e,
+                }
+            )
+            return self.decode(entry)
+
+    def set(
+        self,
+        key: str,
+        value: ModelType,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        payload, compressed = self.encode(value)
+
+        self._set_payload(key, payload, compressed, etag, last_modified)
+
+    def _set_payload(
+        self,
+        key: str,
+        payload: bytes,
+        compressed: bool,
+        etag: str | None,
+        last_modified: str | None,
+    ) -> CacheEntry:
+        now = time.time()
+
+        entry = CacheEntry(
+            payload=payload,
+            compressed=compressed,
+            fresh_until=now + self.ttl,
+            stale_until=now + self.ttl + self.max_stale,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+        cache.set(
+            key,
+            entry,
+            timeout=self.ttl + self.max_stale,
+        )
+
+        return entry
+
+    def set_not_found(self, key: str) -> None:
+        now = time.time()
+
+        cache.set(
+            key,
+            CacheEntry(
+                payload=None,
+                compressed=False,
+                fresh_until=now + self.negative_ttl,
+                stale_until=now + self.negative_ttl,
+            ),
+            timeout=self.negative_ttl,
+        )
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        fetch: FetchFunction,
+        entry: CacheEntry | None,
+    ) -> ModelType:
+        current = entry if entry is not None and not entry.not_found else None
+
+        response = await fetch(current.conditional_headers if current else {})
+
+        if current is not None and response.status_code == NOT_MODIFIED_304:
+            cache_stats.revalidated(self.resource)
+
+            refreshed = self._set_payload(
+                key,
+                current.payload,
+                current.compressed,
+                etag=response.headers.get("ETag", current.etag),
+                last_modified=response.headers.get("Last-Modified", current.last_modified),
+            )
+            return self.decode(refreshed)
+
+        try:
+            check_response(response, self.error_message)
+        except ScheduleNotFoundError:
+            self.set_not_found(key)
+            raise
+
+        value = self.schema.model_validate_json(response.content)
+
+        self.set(
+            key,
+            value,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+        return value
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        fetch: FetchFunction,
+        entry: CacheEntry | None,
+    ) -> None:
+        task = create_detached_task(self.single_flight.do(key, lambda: self._fetch_and_store(key, fetch, entry)))
+
+        # Keep a reference, so the task is not garbage collected before it's done
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_refreshed)
+
+    def _on_refreshed(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+
+        if not task.cancelled() and (error := task.exception()) is not None:
+            main_logger.warning(
+                {
+                    "msg": "Background refresh of schedule cache failed",
+                    "resource": self.resource,
+                    "error": error,
+                }
+            )
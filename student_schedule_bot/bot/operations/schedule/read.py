@@ -1,13 +1,20 @@
+from collections.abc import Callable
 from typing import TYPE_CHECKING
 
-from django.core.cache import cache
-from libs.requests.sender import HttpxRequestParameters, RequestSender
-from libs.requests.status_codes import OK_200
+from libs.requests.sender import HttpxRequestParameters, Limits, RequestSender
 from student_schedule_bot.config import config
+from student_schedule_bot.lifespan import register_shutdown
 
+from bot.operations.schedule.cache import (
+    ResourceCache,
+    SingleFlight,
+    check_response,
+    make_cache_key,
+)
 from bot.schemas.schedule.schedule import PhotoSchedule, Schedule, ScheduleFilters, ScheduleResponse
 
 if TYPE_CHECKING:
+    import httpx
     import pydantic
 
     from bot.models.user import User
@@ -16,52 +23,99 @@ if TYPE_CHECKING:
 sender = RequestSender(
     "student_schedule_bot/0.0.0",
     base_url=str(config.SCHEDULE_URL),
+    limits=Limits(
+        max_connections=config.SCHEDULE_MAX_CONNECTIONS,
+        max_keepalive_connections=config.SCHEDULE_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.SCHEDULE_KEEPALIVE_EXPIRY,
+    ),
+    http2=config.SCHEDULE_HTTP2,
+)
+
+register_shutdown(RequestSender.aclose_all)
+
+# Concurrent cache misses for the same key share one backend request
+single_flight = SingleFlight()
+
+schedule_cache = ResourceCache(
+    "list",
+    ScheduleResponse,
+    "Failed to get schedule",
+    ttl=config.SCHEDULE_LIST_CACHE_TTL,
+    max_stale=config.SCHEDULE_CACHE_MAX_STALE,
+    negative_ttl=config.SCHEDULE_NEGATIVE_CACHE_TTL,
+    stale_while_revalidate=config.SCHEDULE_STALE_WHILE_REVALIDATE,
+    compress=config.SCHEDULE_CACHE_COMPRESSION,
+    single_flight=single_flight,
+)
+schedule_item_cache = ResourceCache(
+    "item",
+    Schedule,
+    "Failed to get schedule item",
+    ttl=config.SCHEDULE_ITEM_CACHE_TTL,
+    max_stale=config.SCHEDULE_CACHE_MAX_STALE,
+    negative_ttl=config.SCHEDULE_NEGATIVE_CACHE_TTL,
+    stale_while_revalidate=config.SCHEDULE_STALE_WHILE_REVALIDATE,
+    compress=config.SCHEDULE_CACHE_COMPRESSION,
+    single_flight=single_flight,
+)
+photo_schedule_cache = ResourceCache(
+    "photo",
+    PhotoSchedule,
+    "Failed to get photo schedule",
+    ttl=config.SCHEDULE_PHOTO_CACHE_TTL,
+    max_stale=config.SCHEDULE_CACHE_MAX_STALE,
+    negative_ttl=config.SCHEDULE_NEGATIVE_CACHE_TTL,
+    stale_while_revalidate=config.SCHEDULE_STALE_WHILE_REVALIDATE,
+    compress=config.SCHEDULE_CACHE_COMPRESSION,
+    single_flight=single_flight,
 )
 
 
 async def get_schedule(
-    user: "User",
+    user: "User | None",
     filters: "ScheduleFilters | None" = None,
+    *,
+    cache_scope: Callable[["User | None"], str | None] | None = None,
+    force_refresh: bool = False,
 ) -> ScheduleResponse:
+    """
+    Returns a page of the schedule.
+
+    The schedule is the same for everyone, so the cache is shared between users.
+    Pass `cache_scope` to split it (e.g. by user's group) once results start depending on the user.
+    `force_refresh` skips the cache lookup, but still stores the result.
+    """
     # NOTE: Use user's group for filtering? (Note that it only works for Group's schedule though 🤔)
     # For Future
     if not filters:
         filters = ScheduleFilters(page=1)
 
-    cache_key = f"schedule_{user.pk}_{filters.model_dump()}"
+    cache_key = make_cache_key(
+        "schedule",
+        filters=filters,
+        scope=cache_scope(user) if cache_scope else None,
+    )
 
-    response = cache.get(cache_key, default=None)
-    if response:
-        return ScheduleResponse.model_validate(response)
+    return await schedule_cache.get(
+        cache_key,
+        lambda headers: _fetch_schedule(filters, headers),
+        force_refresh=force_refresh,
+    )
 
-    response = await sender.send_async(
+
+async def _fetch_schedule(
+    filters: "ScheduleFilters",
+    headers: dict[str, str],
+) -> "httpx.Response":
+    return await sender.send_async(
         "GET",
         "/schedule/schedule/",
         HttpxRequestParameters(
             params=filters.model_dump(),
+            headers=headers,
         ),
     )
 
-    if response.status_code != OK_200:
-        raise RuntimeError(
-            {
-                "msg": "Failed to get schedule",
-                "response": response,
-                "response.content": response.content,
-                "response.request.url": response.request.url,
-            }
-        )
-
-    result = ScheduleResponse.model_validate(response.json())
-
-    cache.set(
-        cache_key,
-        result,
-        timeout=60 * 5,
-    )
-
-    return result
-
 
 async def get_schedule_using_url(
     url: str,
@@ -71,84 +125,66 @@ async def get_schedule_using_url(
         url,
     )
 
-    if response.status_code != OK_200:
-        raise RuntimeError(
-            {
-                "msg": "Failed to get schedule using url",
-                "response": response,
-                "response.content": response.content,
-                "response.request.url": response.request.url,
-            }
-        )
+    check_response(response, "Failed to get schedule using url")
 
     return ScheduleResponse.model_validate(response.json())
 
 
+def get_schedule_item_cache_key(item_id: "pydantic.UUID4") -> str:
+    return f"schedule_item_{item_id}"
+
+
 async def get_schedule_item(
     item_id: "pydantic.UUID4",
+    *,
+    force_refresh: bool = False,
 ) -> "Schedule":
-    cache_key = f"schedule_item_{item_id}"
-
-    response = cache.get(cache_key, default=None)
-    if response:
-        return Schedule.model_validate(response)
-
-    response = await sender.send_async(
-        "GET",
-        f"/schedule/schedule/{item_id}/",
+    return await schedule_item_cache.get(
+        get_schedule_item_cache_key(item_id),
+        lambda headers: _fetch_schedule_item(item_id, headers),
+        force_refresh=force_refresh,
     )
 
-    if response.status_code != OK_200:
-        raise RuntimeError(
-            {
-                "msg": "Failed to get schedule item",
-                "response": response,
-                "response.content": response.content,
-                "response.request.url": response.request.url,
-            }
-        )
 
-    result = Schedule.model_validate(response.json())
+def prime_schedule_items(schedule: ScheduleResponse) -> None:
+    """Stores items of a schedule page in the item cache, as the list already contains all of their data."""
+    for item in schedule.results:
+        schedule_item_cache.set(get_schedule_item_cache_key(item.uuid), item)
 
-    cache.set(
-        cache_key,
-        result,
-        timeout=60 * 5,
-    )
 
-    return result
+async def _fetch_schedule_item(
+    item_id: "pydantic.UUID4",
+    headers: dict[str, str],
+) -> "httpx.Response":
+    return await sender.send_async(
+        "GET",
+        f"/schedule/schedule/{item_id}/",
+        HttpxRequestParameters(
+            headers=headers,
+        ),
+    )
 
 
 async def get_photo_schedule(
     photo_schedule_id: "pydantic.UUID4",
+    *,
+    force_refresh: bool = False,
 ) -> PhotoSchedule:
-    cache_key = f"photo_schedule_{photo_schedule_id}"
+    return await photo_schedule_cache.get(
+        f"photo_schedule_{photo_schedule_id}",
+        lambda headers: _fetch_photo_schedule(photo_schedule_id, headers),
+        force_refresh=force_refresh,
+    )
 
-    response = cache.get(cache_key, default=None)
-    if response:
-        return PhotoSchedule.model_validate(response)
 
-    response = await sender.send_async(
+async def _fetch_photo_schedule(
+    photo_schedule_id: "pydantic.UUID4",
+    headers: dict[str, str],
+) -> "httpx.Response":
+    return await sender.send_async(
         "GET",
         f"/schedule/photo/{photo_schedule_id}/",
+        HttpxRequestParameters(
+            headers=headers,
+        ),
     )
-
-    if response.status_code != OK_200:
-        raise RuntimeError(
-            {
-                "msg": "Failed to get photo schedule",
-                "response": response,
-                "response.content": response.content,
-                "response.request.url": response.request.url,
-            }
-        )
-
-    result = PhotoSchedule.model_validate(response.json())
-
-    cache.set(
-        cache_key,
-        result,
-        timeout=60 * 5,
-    )
-
-    return result
@@ -0,0 +1,179 @@
+import asyncio
+
+import httpx
+import pydantic
+import pytest
+from django.core.cache import cache
+
+from bot.operations.schedule.cache import ResourceCache, SingleFlight, cache_stats
+
+BACKEND_URL = "http://backend/schedule/"
+
+
+class Item(pydantic.BaseModel):
+    name: str
+
+
+class FakeBackend:
+    """Answers every request with the given item after `delay` seconds, counting requests per key."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.requests: dict[str, int] = {}
+        self.fail = False
+
+    def fetch(self, key: str):  # noqa: ANN201
+        async def _fetch(headers: dict[str, str]) -> httpx.Response:  # noqa: ARG001
+            self.requests[key] = self.requests.get(key, 0) + 1
+            await asyncio.sleep(self.delay)
+
+            if self.fail:
+                raise httpx.ConnectError("Backend is down")
+
+            return httpx.Response(
+                200,
+                json={"name": key},
+                request=httpx.Request("GET", BACKEND_URL),
+            )
+
+        return _fetch
+
+
+def make_cache(single_flight: SingleFlight) -> ResourceCache[Item]:
+    return ResourceCache(
+        "item",
+        Item,
+        "Failed to get item",
+        ttl=60,
+        max_stale=60,
+        negative_ttl=30,
+        stale_while_revalidate=True,
+        compress=False,
+        single_flight=single_flight,
+    )
+
+
+def test_concurrent_misses_make_one_request_per_key() -> None:
+    backend = FakeBackend()
+    single_flight = SingleFlight()
+    items = make_cache(single_flight)
+
+    async def run() -> list[Item]:
+        return await asyncio.gather(
+            *(items.get(key, backend.fetch(key)) for key in ["first", "second"] * 25),
+        )
+
+    results = asyncio.run(run())
+
+    assert backend.requests == {"first": 1, "second": 1}
+    assert [item.name for item in results] == ["first", "second"] * 25
+    assert single_flight.in_flight == 0
+
+
+def test_failure_reaches_every_waiter_and_is_not_cached() -> None:
+    backend = FakeBackend()
+    backend.fail = True
+    items = make_cache(SingleFlight())
+
+    async def run() -> list[Item | BaseException]:
+        return await asyncio.gather(
+            *(items.get("key", backend.fetch("key")) for _ in range(10)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert backend.requests == {"key": 1}
+    assert all(isinstance(result, httpx.ConnectError) for result in results)
+
+    backend.fail = False
+    assert asyncio.run(items.get("key", backend.fetch("key"))).name == "key"
+    assert backend.requests == {"key": 2}
+
+
+def test_cancelled_caller_does_not_cancel_the_request() -> None:
+    backend = FakeBackend()
+    items = make_cache(SingleFlight())
+
+    async def run() -> Item:
+        first = asyncio.ensure_future(items.get("key", backend.fetch("key")))
+        second = asyncio.ensure_future(items.get("key", backend.fetch("key")))
+
+        await asyncio.sleep(0)
+        first.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        return await second
+
+    assert asyncio.run(run()).name == "key"
+    assert backend.requests == {"key": 1}
+
+
+class ConditionalBackend:
+    """Answers `304 Not Modified` to requests with the current ETag, the item otherwise."""
+
+    def __init__(self) -> None:
+        self.etag = '"v1"'
+        self.name = "first"
+        self.received_headers: list[dict[str, str]] = []
+
+    async def fetch(self, headers: dict[str, str]) -> httpx.Response:
+        self.received_headers.append(headers)
+        request = httpx.Request("GET", BACKEND_URL, headers=headers)
+
+        if headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, headers={"ETag": self.etag}, request=request)
+
+        return httpx.Response(
+            200,
+            json={"name": self.name},
+            headers={
+                "ETag": self.etag,
+                "Last-Modified": "Wed, 01 Oct 2025 10:00:00 GMT",
+            },
+            request=request,
+        )
+
+
+def test_refresh_is_revalidated_with_a_conditional_request() -> None:
+    backend = ConditionalBackend()
+    items = make_cache(SingleFlight())
+    not_modified = cache_stats.not_modified["item"]
+
+    assert asyncio.run(items.get("key", backend.fetch)).name == "first"
+    assert backend.received_headers == [{}]
+
+    entry = cache.get("key")
+
+    for _ in range(3):
+        assert asyncio.run(items.get("key", backend.fetch, force_refresh=True)).name == "first"
+
+    revalidation_headers = {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Oct 2025 10:00:00 GMT",
+    }
+    assert backend.received_headers[1:] == [revalidation_headers] * 3
+    assert cache_stats.not_modified["item"] == not_modified + 3
+
+    # A 304 keeps the stored payload and only extends the entry
+    refreshed = cache.get("key")
+    assert refreshed.payload == entry.payload
+    assert refreshed.fresh_until >= entry.fresh_until
+
+
+def test_changed_resource_replaces_the_entry() -> None:
+    backend = ConditionalBackend()
+    items = make_cache(SingleFlight())
+
+    asyncio.run(items.get("key", backend.fetch))
+
+    backend.etag = '"v2"'
+    backend.name = "second"
+
+    assert asyncio.run(items.get("key", backend.fetch, force_refresh=True)).name == "second"
+    assert cache.get("key").etag == '"v2"'
+    assert asyncio.run(items.get("key", backend.fetch)).name == "second"
+    # Only the forced refresh reached the backend, and it was a conditional request
+    assert [bool(headers) for headers in backend.received_headers] == [False, True]
@@ -0,0 +1,163 @@
+import asyncio
+import contextlib
+import datetime as dt
+import time
+from typing import TYPE_CHECKING
+
+from django.utils import timezone
+from student_schedule_bot.config import config
+from student_schedule_bot.logger import main_logger
+
+from bot.operations.schedule.read import get_photo_schedule, get_schedule, prime_schedule_items
+from bot.schemas.base import Schema
+from bot.schemas.schedule.schedule import ScheduleFilters
+
+if TYPE_CHECKING:
+    import pydantic
+
+
+class WarmupResult(Schema):
+    pages: int = 0
+    items: int = 0
+    photos: int = 0
+    failed: int = 0
+
+    duration: float = 0.0
+
+
+async def warm_schedule_cache(
+    days: int,
+    max_pages: int,
+    concurrency: int,
+) -> WarmupResult:
+    """
+    Pre-populates the schedule caches, so interactive handlers rarely wait for the backend.
+
+    Pages through the same schedule list users see, stores its items in the item cache,
+    and fetches photo schedules of items for the upcoming `days` (at most `concurrency` at a time).
+    Paging stops once a page has no upcoming items.
+    """
+    started_at = time.monotonic()
+    result = WarmupResult()
+
+    today = timezone.localdate()
+    until = today + dt.timedelta(days=days)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    photo_ids: set[pydantic.UUID4] = set()
+
+    for page in range(1, max_pages + 1):
+        schedule = await get_schedule(
+            user=None,
+            filters=ScheduleFilters(page=page),
+            force_refresh=True,
+        )
+        result.pages += 1
+
+        prime_schedule_items(schedule)
+        result.items += len(schedule.results)
+
+        upcoming = [item for item in schedule.results if item.for_date >= today]
+
+        photo_ids.update(
+            photo_id for item in upcoming if item.for_date <= until and (photo_id := item.photo_schedule_id) is not None
+        )
+
+        if not upcoming or not schedule.next_page_number:
+            break
+
+    async def warm_photo(photo_id: "pydantic.UUID4") -> bool:
+        async with semaphore:
+            try:
+                await get_photo_schedule(photo_id, force_refresh=True)
+            except Exception as e:  # noqa: BLE001
+                main_logger.warning(
+                    {
+                        "msg": "Failed to warm up photo schedule",
+                        "photo_schedule_id": photo_id,
+                        "error": e,
+                    }
+                )
+                return False
+
+            return True
+
+    for warmed in await asyncio.gather(*(warm_photo(photo_id) for photo_id in photo_ids)):
+        if warmed:
+            result.photos += 1
+        else:
+            result.failed += 1
+
+    result.duration = time.monotonic() - started_at
+
+    main_logger.info(
+        {
+            "msg": "Schedule cache warmed up",
+            "result": result.model_dump(),
+        }
+    )
+
+    return result
+
+
+class PeriodicWarmup:
+    """
+    Runs `warm_schedule_cache` in the background of the web process every `interval` seconds.
+
+    Needed with process-local caches (LocMemCache), which the management command can't fill.
+    """
+
+    def __init__(
+        self,
+        interval: int,
+        days: int,
+        max_pages: int,
+        concurrency: int,
+    ) -> None:
+        self.interval = interval
+        self.days = days
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await warm_schedule_cache(
+                    days=self.days,
+                    max_pages=self.max_pages,
+                    concurrency=self.concurrency,
+                )
+            except Exception as e:  # noqa: BLE001
+                main_logger.exception(
+                    {
+                        "msg": "Schedule cache warm-up failed",
+                        "error": e,
+                    }
+                )
+
+            await asyncio.sleep(self.interval)
+
+
+periodic_warmup = PeriodicWarmup(
+    interval=config.SCHEDULE_WARMUP_INTERVAL,
+    days=config.SCHEDULE_WARMUP_DAYS,
+    max_pages=config.SCHEDULE_WARMUP_MAX_PAGES,
+    concurrency=config.SCHEDULE_WARMUP_CONCURRENCY,
+)
@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+from typing import TYPE_CHECKING
+
+import pytest
+from telegram import Update
+from telegram.ext import DictPersistence
+from telegram.request import HTTPXRequest
+
+from bot.models.telegram.bot import Bot
+from bot.operations.telegram import bot as telegram_bot
+
+if TYPE_CHECKING:
+    from conftest import Benchmark
+
+    from bot.operations.telegram.conftest import FakeBotApi
+
+pytestmark = pytest.mark.benchmark
+
+NUMBER = 10
+REPEAT = 3
+
+
+def get_update_data(update_id: int) -> dict:
+    # A plain text message: no handler reacts to it, so only the per-update overhead is measured
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 42, "type": "private"},
+            "from": {"id": 42, "is_bot": False, "first_name": "Student"},
+            "text": "hello",
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def fake_network(fake_bot_api: "FakeBotApi", monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(HTTPXRequest, "do_request", fake_bot_api.do_request)
+    monkeypatch.setattr(telegram_bot, "get_persistence", lambda _bot_instance: DictPersistence())
+
+
+def test_update_latency(
+    benchmark: "Benchmark",
+    fake_bot_api: "FakeBotApi",
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    bot_instance = Bot(name="benchmark", token="1:benchmark")
+    update_ids = itertools.count(1)
+
+    registry = telegram_bot.ApplicationRegistry()
+    monkeypatch.setattr(telegram_bot, "application_registry", registry)
+
+    async def process_with_new_application() -> None:
+        # What every webhook did before the registry
+        application = telegram_bot.build_application(bot_instance)
+
+        async with application:
+            update = Update.de_json(get_update_data(next(update_ids)), bot=application.bot)
+            await application.process_update(update)
+            await application.update_persistence()
+
+    async def process_with_registry() -> None:
+        await telegram_bot.process_webhook_with_bot(bot_instance, get_update_data(next(update_ids)))
+
+    async def run() -> tuple[float, float]:
+        try:
+            cold = await benchmark.measure_async(
+                "registry: update with a new Application per update",
+                process_with_new_application,
+                number=NUMBER,
+                repeat=REPEAT,
+            )
+            get_me_calls = fake_bot_api.count("getMe")
+
+            warm = await benchmark.measure_async(
+                "registry: update with a long-lived Application",
+                process_with_registry,
+                number=NUMBER,
+                repeat=REPEAT,
+            )
+        finally:
+            await registry.shutdown()
+
+        # `initialize` calls `getMe` once per Application
+        assert get_me_calls == NUMBER * REPEAT
+        assert fake_bot_api.count("getMe") == get_me_calls + 1
+
+        return cold, warm
+
+    cold, warm = asyncio.run(run())
+
+    # Even without a network round trip for `getMe`, building an Application per update is slower
+    assert warm < cold
+
+
+def test_bots_start_concurrently(fake_bot_api: "FakeBotApi", monkeypatch: pytest.MonkeyPatch) -> None:
+    delay = 0.5
+    do_request = fake_bot_api.do_request
+
+    async def slow_do_request(_request: HTTPXRequest, *args, **kwargs) -> tuple[int, bytes]:  # noqa: ANN002, ANN003
+        await asyncio.sleep(delay)
+        return await do_request(*args, **kwargs)
+
+    monkeypatch.setattr(HTTPXRequest, "do_request", slow_do_request)
+
+    registry = telegram_bot.ApplicationRegistry()
+    bots = [Bot(name=f"benchmark_{number}", token=f"{number}:benchmark") for number in range(5)]
+
+    async def run() -> float:
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+
+        try:
+            await asyncio.gather(*(registry.get(bot_instance) for bot_instance in bots))
+            return loop.time() - started_at
+        finally:
+            await registry.shutdown()
+
+    # With one lock for all bots, every `getMe` would wait for the previous one
+    assert asyncio.run(run()) < delay * 2
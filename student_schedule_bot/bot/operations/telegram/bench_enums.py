@@ -0,0 +1,69 @@
+import urllib.parse
+import uuid
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bot.operations.telegram.enums import PAGED_COMMANDS, CallbackData, Commands
+
+if TYPE_CHECKING:
+    from conftest import Benchmark
+
+pytestmark = pytest.mark.benchmark
+
+# Telegram's limit of callback data, in bytes
+MAX_CALLBACK_DATA_SIZE = 64
+
+
+def get_largest(command: Commands) -> CallbackData:
+    if command in PAGED_COMMANDS:
+        return CallbackData(command, page=10**6)
+
+    # Up to two UUIDs (photo schedule and the item to go back to)
+    return CallbackData(command, ids=(uuid.uuid4(), uuid.uuid4()))
+
+
+def parse_query_string(callback_data: str) -> tuple[uuid.UUID | None, uuid.UUID | None]:
+    # How handlers parsed the URL-query format used before, e.g. `show_photo_schedule?id=<uuid>?item_id=<uuid>`
+    result = urllib.parse.parse_qs(qs="&".join(callback_data.split("?")[1:]))
+
+    photo_id = uuid.UUID(result["id"][0]) if "id" in result else None
+    item_id = uuid.UUID(result["item_id"][0]) if "item_id" in result else None
+
+    return photo_id, item_id
+
+
+@pytest.mark.parametrize("command", list(Commands))
+def test_codec(command: Commands, benchmark: "Benchmark") -> None:
+    callback_data = get_largest(command)
+    encoded = callback_data.encode()
+    size = len(encoded.encode())
+
+    benchmark.report(f"callback data: {command.name}, size", size, "bytes")
+    benchmark.measure(f"callback data: {command.name}, encode", callback_data.encode, number=10_000)
+    benchmark.measure(f"callback data: {command.name}, decode", lambda: CallbackData.decode(encoded), number=10_000)
+
+    assert size <= MAX_CALLBACK_DATA_SIZE
+    assert CallbackData.decode(encoded) == callback_data
+
+
+def test_query_string_format(benchmark: "Benchmark") -> None:
+    photo_id, item_id = uuid.uuid4(), uuid.uuid4()
+    query_string = f"show_photo_schedule?id={photo_id}?item_id={item_id}"
+    encoded = Commands.show_photo_schedule(photo_id, item_id)
+
+    benchmark.report("callback data: query string format, size", len(query_string.encode()), "bytes")
+    benchmark.measure(
+        "callback data: query string format, parse",
+        lambda: parse_query_string(query_string),
+        number=10_000,
+    )
+    benchmark.measure(
+        "callback data: SHOW_PHOTO_SCHEDULE, decode (same ids)",
+        lambda: CallbackData.decode(encoded),
+        number=10_000,
+    )
+
+    assert parse_query_string(query_string) == CallbackData.decode(encoded).ids
+    # The query string doesn't even fit Telegram's limit, so it needed `arbitrary_callback_data`
+    assert len(query_string.encode()) > MAX_CALLBACK_DATA_SIZE
@@ -0,0 +1,37 @@
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bot.operations.conftest import make_schedule_response
+from bot.operations.telegram.messages import get_schedule_render_key, render_schedule
+from bot.operations.telegram.rendering import RenderCache, RenderedMessage
+
+if TYPE_CHECKING:
+    from conftest import Benchmark
+
+pytestmark = pytest.mark.benchmark
+
+ITEMS = 50
+
+
+def test_render_schedule_page(benchmark: "Benchmark") -> None:
+    schedule = make_schedule_response(ITEMS)
+    render_cache = RenderCache(max_size=16)
+
+    # Rendering alone isn't the whole cost, the keyboard is serialized for every request too
+    def render() -> dict:
+        return render_schedule(schedule).markup.to_dict()
+
+    def get_cached() -> dict:
+        rendered: RenderedMessage = render_cache.get_or_render(
+            get_schedule_render_key(schedule),
+            lambda: render_schedule(schedule),
+        )
+        return rendered.markup.to_dict()
+
+    render_time = benchmark.measure(f"render: schedule page of {ITEMS} items", render, number=200)
+    cached_time = benchmark.measure(f"render: schedule page of {ITEMS} items, cached", get_cached, number=200)
+
+    assert get_cached() == render()
+    assert render_cache.misses == 1
+    assert cached_time < render_time / 5
@@ -0,0 +1,99 @@
+import asyncio
+import uuid
+from enum import StrEnum
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+from telegram import Update
+from telegram.ext import CallbackQueryHandler
+
+from bot.operations.telegram.enums import CallbackData, Commands
+from bot.operations.telegram.router import CommandRouter
+
+if TYPE_CHECKING:
+    from conftest import Benchmark
+
+pytestmark = pytest.mark.benchmark
+
+ROUTE_COUNTS = (5, 50, 500)
+
+
+class FakeCallbackQuery:
+    def __init__(self, data: str) -> None:
+        self.data = data
+
+    async def answer(self) -> None:
+        pass
+
+
+async def show_item(update: object, context: object, callback_data: CallbackData) -> None:
+    pass
+
+
+def build_router(count: int) -> CommandRouter:
+    router = CommandRouter()
+    router.route(Commands.SHOW_ITEM)(show_item)
+
+    # Commands that are never tapped, only to grow the routing table
+    extra_commands = StrEnum("ExtraCommands", {f"EXTRA_{number}": f"extra_{number}" for number in range(count - 1)})
+    router.route(*extra_commands)(show_item)
+
+    return router
+
+
+def build_pattern_handlers(count: int) -> list[CallbackQueryHandler]:
+    # What dispatching was before the router: a handler with its own pattern per command, tried in turn
+    return [CallbackQueryHandler(show_item, pattern=rf"^command_{number}\?id=.*$") for number in range(count)]
+
+
+def find_handler(handlers: list[CallbackQueryHandler], update: Update) -> CallbackQueryHandler:
+    return next(handler for handler in handlers if handler.check_update(update))
+
+
+def test_dispatch(benchmark: "Benchmark") -> None:
+    data = Commands.show_item(uuid.uuid4())
+    update = SimpleNamespace(callback_query=FakeCallbackQuery(data))
+
+    async def run() -> dict[int, float]:
+        timings = {}
+
+        for count in ROUTE_COUNTS:
+            router = build_router(count)
+
+            timings[count] = await benchmark.measure_async(
+                f"router: dispatch with {count} routes",
+                lambda router=router: router.dispatch(update, None),
+                number=2000,
+            )
+
+        return timings
+
+    timings = asyncio.run(run())
+
+    # One dict lookup, whatever the number of routes
+    assert timings[ROUTE_COUNTS[-1]] < timings[ROUTE_COUNTS[0]] * 2
+
+
+def test_pattern_handlers(benchmark: "Benchmark") -> None:
+    for count in ROUTE_COUNTS:
+        handlers = build_pattern_handlers(count)
+        # The worst case, the command of the last handler
+        update = Update.de_json(
+            {
+                "update_id": 1,
+                "callback_query": {
+                    "id": "1",
+                    "from": {"id": 42, "is_bot": False, "first_name": "Student"},
+                    "chat_instance": "1",
+                    "data": f"command_{count - 1}?id={uuid.uuid4()}",
+                },
+            },
+            bot=None,
+        )
+
+        benchmark.measure(
+            f"router: pattern handlers with {count} routes",
+            lambda handlers=handlers, update=update: find_handler(handlers, update),
+            number=100,
+        )
@@ -1,165 +1,325 @@
+import asyncio
 from typing import TYPE_CHECKING
 
+from django.core.cache import cache
+from student_schedule_bot.config import config
+from student_schedule_bot.lifespan import register_shutdown
+from student_schedule_bot.logger import main_logger
 from telegram import Update
 from telegram.ext import (
     Application,
+    BaseHandler,
+    BasePersistence,
     CallbackQueryHandler,
     CommandHandler,
-    InvalidCallbackData,
+    MessageHandler,
     PicklePersistence,
 )
 
 from bot.operations.telegram import handlers
-from bot.operations.telegram.enums import Commands
+from bot.operations.telegram.error_reports import error_digest
+from bot.operations.telegram.persistence import DatabasePersistence, RedisPersistence
+from bot.operations.telegram.rate_limiter import TokenBucketRateLimiter, rate_limit_stats
+from bot.operations.telegram.router import router
+from bot.operations.telegram.timings import UpdateTimings, current_timings, recycle_connections, time_thread_hops
+from bot.operations.telegram.webhook_reply import (
+    CONNECTION_POOL_SIZE,
+    WebhookReply,
+    WebhookReplyRequest,
+    current_webhook_reply,
+)
+from bot.schemas.metrics import UpdateStats
 
 if TYPE_CHECKING:
     from bot.models.telegram.bot import Bot as BotModel
 
 
-async def get_bot(bot_instance: "BotModel") -> "Application":
-    application = (
-        Application.builder()
-        .token(bot_instance.token)
-        .persistence(PicklePersistence(filepath=f"bot_data_{bot_instance.pk}.pkl"))
-        .arbitrary_callback_data(arbitrary_callback_data=True)
-        .build()
-    )
+def get_persistence(bot_instance: "BotModel") -> "BasePersistence":
+    match config.TELEGRAM_PERSISTENCE:
+        case "database":
+            return DatabasePersistence(bot_id=bot_instance.pk)
+        case "redis":
+            if config.REDIS_URL is None:
+                raise ValueError("REDIS_URL must be set to use Redis persistence.")
+
+            return RedisPersistence(
+                url=str(config.REDIS_URL),
+                namespace=f"student_schedule_bot:{bot_instance.pk}",
+            )
+        case "pickle":
+            return PicklePersistence(filepath=f"bot_data_{bot_instance.pk}.pkl")
+        case _:
+            raise ValueError(f"Invalid persistence: {config.TELEGRAM_PERSISTENCE}")
 
-    application.add_handler(
+
+def get_handlers() -> list[BaseHandler]:
+    """Returns the handlers every Application is built with."""
+    return [
         CommandHandler(
             "start",
             handlers.start,
-        )
-    )
-
-    application.add_handler(
+        ),
         CommandHandler(
             "clear_keyboard",
             handlers.clear_keyboards,
-        )
-    )
+        ),
+        # Every callback query goes through the router, see `handlers` for the routes of each command
+        router.as_handler(),
+        # Handlers to bring back (to_start, show_balances, show_settings, show_tasks, show_tasks_pages, update_event,
+        # set_event, toggle_publicity, remove_account) are routed with `@router.route(Commands.<COMMAND>)` in `handlers`
+    ]
 
-    application.add_handler(
-        CallbackQueryHandler(
-            handlers.error_handler,
-            pattern=InvalidCallbackData,
-        )
-    )
 
-    application.add_handler(
-        CallbackQueryHandler(
-            handlers.start,
-            pattern=Commands.SHOW_MAIN_MENU.as_regex,
-        )
-    )
+# Update fields each type of handler reacts to, edited commands are not handled on purpose
+UPDATE_TYPES_BY_HANDLER: dict[type[BaseHandler], tuple[str, ...]] = {
+    CommandHandler: (Update.MESSAGE,),
+    MessageHandler: (Update.MESSAGE,),
+    CallbackQueryHandler: (Update.CALLBACK_QUERY,),
+}
 
-    application.add_handler(
-        CallbackQueryHandler(
-            handlers.show_schedule,
-            pattern=Commands.SHOW_SCHEDULE.as_regex,
-        )
-    )
 
-    application.add_handler(
-        CallbackQueryHandler(
-            handlers.show_schedule,
-            pattern=Commands.SCHEDULE_PAGE.as_regex,
-        )
-    )
+def get_allowed_updates(bot_handlers: list[BaseHandler] | None = None) -> list[str]:
+    """
+    Returns update types the handlers (by default, the ones of `get_handlers`) react to,
+    so Telegram doesn't send us any other updates.
 
-    application.add_handler(
-        CallbackQueryHandler(
-            handlers.show_item,
-            pattern=Commands.SHOW_ITEM.as_regex,
-        )
+    A handler of an unknown type allows every update type, to not lose updates it might need.
+    """
+    allowed_updates: list[str] = []
+
+    for handler in get_handlers() if bot_handlers is None else bot_handlers:
+        update_types = UPDATE_TYPES_BY_HANDLER.get(type(handler))
+
+        if update_types is None:
+            return list(Update.ALL_TYPES)
+
+        allowed_updates.extend(update_type for update_type in update_types if update_type not in allowed_updates)
+
+    return allowed_updates
+
+
+def build_application(bot_instance: "BotModel") -> "Application":
+    """Builds a (not yet initialized) Application with all handlers registered."""
+    builder = (
+        Application.builder()
+        .token(bot_instance.token)
+        .persistence(get_persistence(bot_instance))
+        .request(WebhookReplyRequest(connection_pool_size=CONNECTION_POOL_SIZE))
     )
 
-    application.add_handler(
-        CallbackQueryHandler(
-            handlers.show_photo_schedule,
-            pattern=Commands.SHOW_PHOTO_SCHEDULE.as_regex,
+    if config.TELEGRAM_RATE_LIMIT_ENABLED:
+        builder = builder.rate_limiter(
+            TokenBucketRateLimiter(
+                global_rate=config.TELEGRAM_GLOBAL_RATE,
+                chat_rate=config.TELEGRAM_CHAT_RATE,
+                chat_burst=config.TELEGRAM_CHAT_BURST,
+                group_rate=config.TELEGRAM_GROUP_RATE,
+                group_burst=config.TELEGRAM_GROUP_BURST,
+                max_retries=config.TELEGRAM_RATE_LIMIT_MAX_RETRIES,
+                stats=rate_limit_stats,
+            )
         )
-    )
 
-    application.add_error_handler(handlers.error_handler)
+    application = builder.build()
 
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.to_start,
-    #         pattern=Commands.TO_START.as_regex,
-    #     )
-    # )
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.show_balances,
-    #         pattern=Commands.BALANCES.as_regex,
-    #     ),
-    # )
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.show_settings,
-    #         pattern=Commands.SETTINGS.as_regex,
-    #     ),
-    # )
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.show_tasks,
-    #         pattern=Commands.TASKS.as_regex,
-    #     ),
-    # )
-
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.show_tasks_pages,
-    #         pattern=Commands.AVAILABLE_TASKS.as_regex,
-    #     ),
-    # )
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.show_tasks_pages,
-    #         pattern=Commands.COMPLETED_TASKS.as_regex,
-    #     ),
-    # )
-
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.update_event,
-    #         pattern=Commands.CHANGE_EVENT.as_regex,
-    #     )
-    # )
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.set_event,
-    #         pattern=Commands.CHANGE_EVENT_CONFIRMATION.as_regex,
-    #     )
-    # )
-
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.toggle_publicity,
-    #         pattern=Commands.TOGGLE_PUBLICITY.as_regex,
-    #     )
-    # )
-
-    # application.add_handler(
-    #     CallbackQueryHandler(
-    #         handlers.remove_account,
-    #         pattern=Commands.REMOVE_ACCOUNT.as_regex,
-    #     )
-    # )
-
-    await application.initialize()
+    application.add_handlers(get_handlers())
+    application.add_error_handler(handlers.error_handler)
 
     return application
 
 
-async def process_webhook_with_bot(bot_instance: "BotModel", update_data: dict) -> None:
-    application = await get_bot(bot_instance)
+class ApplicationRegistry:
+    """
+    Process-wide storage of running Applications, keyed by `Bot.uuid`.
+
+    Each Application is built, initialized and started once and then reused for every webhook.
+    If the token of the Bot changes, the old Application is shut down and a new one is built.
+    Each bot has its own lock, so starting one Application (which calls `getMe`) doesn't hold up the others.
+    """
+
+    def __init__(self) -> None:
+        self._applications: dict[str, tuple[str, Application]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def _get_lock(self, key: str) -> asyncio.Lock:
+        return self._locks.setdefault(key, asyncio.Lock())
+
+    async def get(self, bot_instance: "BotModel") -> "Application":
+        key = str(bot_instance.uuid)
+
+        stored = self._applications.get(key)
+        if stored is not None and stored[0] == bot_instance.token:
+            return stored[1]
+
+        async with self._get_lock(key):
+            # Another coroutine might have built it while we were waiting for the lock
+            stored = self._applications.get(key)
+            if stored is not None and stored[0] == bot_instance.token:
+                return stored[1]
+
+            if stored is not None:
+                main_logger.info(
+                    {
+                        "msg": "Bot token changed, rebuilding application",
+                        "bot.uuid": key,
+                    }
+                )
+                self._applications.pop(key)
+                await self._stop(stored[1])
+
+            application = build_application(bot_instance)
+            await application.initialize()
+            await application.start()
 
-    update = Update.de_json(update_data, bot=application.bot)
+            self._applications[key] = (bot_instance.token, application)
 
-    application.bot.insert_callback_data(update)
+            return application
+
+    async def discard(self, bot_id: str) -> None:
+        """Stops and forgets the Application of the given bot, if there is one."""
+        async with self._get_lock(bot_id):
+            stored = self._applications.pop(bot_id, None)
+
+            if stored is not None:
+                await self._stop(stored[1])
+
+    async def shutdown(self) -> None:
+        """Stops every stored Application. Called on ASGI lifespan shutdown."""
+        await error_digest.close()
+
+        for key in list(self._applications):
+            await self.discard(key)
+
+    @staticmethod
+    async def _stop(application: "Application") -> None:
+        # Pending error reports are sent by the bots, so they have to go out before a bot is shut down
+        await error_digest.flush()
+
+        if application.running:
+            await application.stop()
+
+        await application.shutdown()
+
+
+application_registry = ApplicationRegistry()
+
+register_shutdown(application_registry.shutdown)
+
+
+async def get_bot(bot_instance: "BotModel") -> "Application":
+    return await application_registry.get(bot_instance)
+
+
+update_stats = UpdateStats()
+
+
+def get_update_dedup_key(bot_instance: "BotModel", update_id: int) -> str:
+    return f"telegram_update_{bot_instance.pk}_{update_id}"
+
+
+def is_duplicate_update(bot_instance: "BotModel", update_data: dict) -> bool:
+    """
+    Checks whether the update was already received within `TELEGRAM_UPDATE_DEDUP_WINDOW`.
+
+    Telegram redelivers updates it didn't get a timely answer for, which would otherwise be handled again.
+    The update is marked as received right away, so concurrent redeliveries are dropped while it's processed,
+    and `forget_update` unmarks it if processing fails, so the next redelivery is handled.
+    """
+    update_id = update_data.get("update_id")
+
+    if update_id is None or not config.TELEGRAM_UPDATE_DEDUP_WINDOW:
+        return False
+
+    # `add` only stores the key if it isn't there yet, so only the first delivery gets True
+    if cache.add(
+        get_update_dedup_key(bot_instance, update_id),
+        value=True,
+        timeout=config.TELEGRAM_UPDATE_DEDUP_WINDOW,
+    ):
+        return False
+
+    update_stats.duplicates += 1
+
+    main_logger.info(
+        {
+            "msg": "Ignoring duplicate update",
+            "bot.uuid": bot_instance.uuid,
+            "update_id": update_id,
+            "duplicates": update_stats.duplicates,
+        }
+    )
+
+    return True
+
+
+def forget_update(bot_instance: "BotModel", update_data: dict) -> None:
+    """Lets a redelivery of the update through again, see `is_duplicate_update`."""
+    update_id = update_data.get("update_id")
+
+    if update_id is not None and config.TELEGRAM_UPDATE_DEDUP_WINDOW:
+        cache.delete(get_update_dedup_key(bot_instance, update_id))
+
+
+async def process_webhook_with_bot(
+    bot_instance: "BotModel",
+    update_data: dict,
+    *,
+    recycle_db_connections: bool = False,
+    reply_in_response: bool = False,
+) -> dict | None:
+    """
+    Processes a single update.
+
+    Pass `recycle_db_connections` when processing outside of an HTTP request (e.g. on a queue worker),
+    otherwise Django already recycles database connections when the request starts.
+    With `reply_in_response`, the first eligible Bot API call isn't sent, but returned,
+    to be used as the webhook response, unless the handler took too long (see `webhook_reply`).
+    """
+    if is_duplicate_update(bot_instance, update_data):
+        return None
+
+    timings = UpdateTimings()
+    token = current_timings.set(timings)
+    time_thread_hops()
+
+    reply = None
+    if reply_in_response and config.TELEGRAM_WEBHOOK_REPLY_MAX_DELAY:
+        reply = WebhookReply(max_delay=config.TELEGRAM_WEBHOOK_REPLY_MAX_DELAY)
+    reply_token = current_webhook_reply.set(reply)
+
+    try:
+        if recycle_db_connections:
+            await recycle_connections()
+
+        application = await get_bot(bot_instance)
+
+        update = Update.de_json(update_data, bot=application.bot)
+
+        await application.process_update(update)
+        update_stats.processed += 1
+
+        # Only the chat/user touched by this update is written, so there is no need to wait for the interval
+        await application.update_persistence()
+    except BaseException:
+        # Handler errors are handled by the Application, so this is a failure to process the update at all
+        # (e.g. to start the Application), the webhook fails and Telegram redelivers the update
+        forget_update(bot_instance, update_data)
+        raise
+    finally:
+        current_webhook_reply.reset(reply_token)
+        current_timings.reset(token)
+        timings.add_to(update_stats)
+
+        main_logger.debug(
+            {
+                "msg": "Processed update",
+                "update_id": update_data.get("update_id"),
+                "timings": timings.as_dict(),
+            }
+        )
 
-    await application.process_update(update)
+    if reply is None or (call := reply.take()) is None:
+        return None
 
-    await application.shutdown()
+    update_stats.webhook_replies += 1
+    return call
@@ -0,0 +1,93 @@
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from telegram.request import BaseRequest
+
+if TYPE_CHECKING:
+    from telegram.request import RequestData
+
+BOT_USER = {
+    "id": 1,
+    "is_bot": True,
+    "first_name": "Schedule",
+    "username": "schedule_bot",
+}
+
+
+class FakeBotApi(BaseRequest):
+    """
+    Bot API that answers every call without any network, recording calls in `requests`.
+
+    Errors can be queued per method with `fail`, they are returned before the successful responses.
+    Calls are answered after `latency` seconds, so that concurrent calls are in flight together.
+    """
+
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+        self.latency = 0.0
+        self._errors: dict[str, list[tuple[int, bytes]]] = {}
+
+    @property
+    def read_timeout(self) -> float | None:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def fail(self, method: str, status_code: int, description: str, **parameters: Any) -> None:  # noqa: ANN401
+        body = {
+            "ok": False,
+            "error_code": status_code,
+            "description": description,
+            "parameters": parameters,
+        }
+        self._errors.setdefault(method, []).append((status_code, json.dumps(body).encode()))
+
+    def count(self, method: str) -> int:
+        return sum(1 for requested, _ in self.requests if requested == method)
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,  # noqa: ARG002
+        request_data: "RequestData | None" = None,
+        **kwargs: Any,  # noqa: ANN401, ARG002
+    ) -> tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data is not None else {}
+
+        self.requests.append((api_method, parameters))
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if errors := self._errors.get(api_method):
+            return errors.pop(0)
+
+        return 200, json.dumps({"ok": True, "result": self.get_result(api_method, parameters)}).encode()
+
+    @staticmethod
+    def get_result(api_method: str, parameters: dict[str, Any]) -> object:
+        if api_method == "getMe":
+            return BOT_USER
+
+        if api_method in {"sendMessage", "editMessageText"}:
+            return {
+                "message_id": parameters.get("message_id", 1),
+                "date": 0,
+                "chat": {"id": parameters["chat_id"], "type": "private"},
+                "from": BOT_USER,
+                "text": parameters.get("text", ""),
+            }
+
+        return True
+
+
+@pytest.fixture
+def fake_bot_api() -> FakeBotApi:
+    return FakeBotApi()
@@ -1,7 +1,7 @@
+import time
 from typing import TypeVar
 
-from asgiref.sync import sync_to_async
-from django.db import close_old_connections
+from bot.operations.telegram.timings import current_timings
 
 FunctionType = TypeVar("FunctionType")
 
@@ -14,8 +14,14 @@ def handler_decorator() -> FunctionType:
             *args,  # noqa: ANN002
             **kwargs,  # noqa: ANN003
         ) -> None:
-            await sync_to_async(close_old_connections)()
-            return await func(*args, **kwargs)
+            # Database connections are recycled once per update, see `process_webhook_with_bot`
+            started_at = time.perf_counter()
+
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if (timings := current_timings.get()) is not None:
+                    timings.handler_time += time.perf_counter() - started_at
 
         return wrapper
 
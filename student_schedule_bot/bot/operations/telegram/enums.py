@@ -1,5 +1,7 @@
-import re
+import base64
+import uuid
 from enum import StrEnum
+from typing import NamedTuple
 
 
 class ApplicationStates(StrEnum):
@@ -7,41 +9,89 @@ class ApplicationStates(StrEnum):
 
 
 class Commands(StrEnum):
-    SHOW_SCHEDULE = "show_schedule"
-    SHOW_MAIN_MENU = "show_main_menu"
+    """
+    Commands of inline buttons.
 
-    SCHEDULE_PAGE = "schedule_page?page="
+    Values are one-character tags, which are the first character of the callback data.
+    The rest of it is a base64url-encoded payload: 16 bytes per UUID, or a big-endian page number
+    (see `CallbackData`). It fits Telegram's 64 bytes limit, so nothing has to be stored on our side.
 
-    SHOW_ITEM = "show_item?id="
+    Tags must not be hex digits: buttons sent before this format carry 64 hex characters,
+    which then match no command and go to the fallback.
+    """
 
-    SHOW_PHOTO_SCHEDULE = "show_photo_schedule?id="
+    SHOW_SCHEDULE = "s"
+    SHOW_MAIN_MENU = "m"
 
-    @property
-    def as_command(self) -> str:
-        return self.value.replace("/", "")
+    SCHEDULE_PAGE = "p"
 
-    @property
-    def as_regex(self) -> str:
-        pattern = re.sub(r"\{[^}]+\}", ".*", self.as_command.replace("?", r"\?"))
+    SHOW_ITEM = "i"
 
-        if self == Commands.SCHEDULE_PAGE:
-            pattern = pattern.replace("page=", r"page=\d")
-        if self in [Commands.SHOW_ITEM, Commands.SHOW_PHOTO_SCHEDULE]:
-            pattern = pattern.replace("id=", r"id=.*")
-
-        return f"^{pattern}$"
+    SHOW_PHOTO_SCHEDULE = "o"
 
     @classmethod
     def schedule_page(cls, page_no: int) -> str:
-        return f"{cls.SCHEDULE_PAGE.value}{page_no}"
+        return CallbackData(cls.SCHEDULE_PAGE, page=page_no).encode()
 
     @classmethod
-    def show_item(cls, item_id: str) -> str:
-        return f"{cls.SHOW_ITEM.value}{item_id}"
+    def show_item(cls, item_id: uuid.UUID) -> str:
+        return CallbackData(cls.SHOW_ITEM, ids=(item_id,)).encode()
 
     @classmethod
-    def show_photo_schedule(cls, photo_id: str, item_id: str | None) -> str:
+    def show_photo_schedule(cls, photo_id: uuid.UUID, item_id: uuid.UUID | None) -> str:
         if not item_id:
-            return f"{cls.SHOW_PHOTO_SCHEDULE.value}{photo_id}"
+            return CallbackData(cls.SHOW_PHOTO_SCHEDULE, ids=(photo_id,)).encode()
+
+        return CallbackData(cls.SHOW_PHOTO_SCHEDULE, ids=(photo_id, item_id)).encode()
+
+
+# Commands with a page number as the payload, others carry UUIDs
+PAGED_COMMANDS = frozenset({Commands.SCHEDULE_PAGE})
+
+COMMANDS_BY_TAG = {command.value: command for command in Commands}
+
+UUID_SIZE = 16
+
+
+class CallbackData(NamedTuple):
+    command: Commands
+    ids: tuple[uuid.UUID, ...] = ()
+    page: int | None = None
+
+    def encode(self) -> str:
+        if self.command in PAGED_COMMANDS:
+            page = self.page or 0
+            payload = page.to_bytes(max(1, (page.bit_length() + 7) // 8))
+        else:
+            payload = b"".join(item_id.bytes for item_id in self.ids)
+
+        return f"{self.command.value}{base64.urlsafe_b64encode(payload).rstrip(b'=').decode()}"
+
+    @classmethod
+    def decode(cls, callback_data: str) -> "CallbackData":
+        """Raises `ValueError` if the callback data isn't in the format of `encode`."""
+        if not callback_data:
+            raise ValueError("Callback data is empty.")
+
+        command = COMMANDS_BY_TAG.get(callback_data[0])
+        if command is None:
+            raise ValueError(f"Unknown callback data command: {callback_data!r}")
+
+        encoded = callback_data[1:]
+
+        if not encoded:
+            return cls(command)
+
+        # `urlsafe_b64decode` would silently skip characters outside of the alphabet
+        payload = base64.b64decode(encoded + "=" * (-len(encoded) % 4), altchars=b"-_", validate=True)
+
+        if command in PAGED_COMMANDS:
+            return cls(command, page=int.from_bytes(payload))
+
+        if len(payload) % UUID_SIZE:
+            raise ValueError(f"Invalid callback data payload: {callback_data!r}")
 
-        return f"{cls.SHOW_PHOTO_SCHEDULE.value}{photo_id}?item_id={item_id}"
+        return cls(
+            command,
+            ids=tuple(uuid.UUID(bytes=payload[i : i + UUID_SIZE]) for i in range(0, len(payload), UUID_SIZE)),
+        )
@@ -0,0 +1,202 @@
+"""
+Aggregation of error reports for the admin chat.
+
+Errors are grouped by their type and the place they were raised at, and every `window` seconds
+each bot sends one digest with the counts, instead of one message per error.
+Pending reports are sent on shutdown by `ApplicationRegistry` (`ErrorDigest.close`), while the bots can still send them.
+"""
+
+import asyncio
+import contextlib
+import time
+import traceback
+from typing import TYPE_CHECKING
+
+from student_schedule_bot.config import config
+from student_schedule_bot.logger import main_logger
+from telegram.constants import MessageLimit
+
+from bot.operations.telegram.rate_limiter import Priority
+from bot.operations.telegram.timings import create_detached_task
+
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import ExtBot
+
+MAX_REPORTS_PER_DIGEST = 10
+# Reports that don't fit into one message are only counted, this leaves room for that line
+MAX_DIGEST_LENGTH = MessageLimit.MAX_TEXT_LENGTH - 64
+# Errors may embed whole responses (e.g. of the schedule backend)
+MAX_ERROR_LENGTH = 500
+MAX_ORIGIN_LENGTH = 200
+
+
+def truncate(text: str, max_length: int) -> str:
+    return text if len(text) <= max_length else f"{text[: max_length - 1]}…"
+
+
+def get_text_length(text: str) -> int:
+    """Length as Telegram counts it, in UTF-16 code units."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def get_error_origin(error: BaseException) -> str:
+    """Returns `file:line (function)` of the innermost frame the error was raised at."""
+    frames = traceback.extract_tb(error.__traceback__)
+
+    if not frames:
+        return "unknown"
+
+    frame = frames[-1]
+    return truncate(f"{frame.filename}:{frame.lineno} ({frame.name})", MAX_ORIGIN_LENGTH)
+
+
+def escape_code(text: str) -> str:
+    """Escapes text for a MarkdownV2 code block."""
+    return text.replace("\\", "\\\\").replace("`", "\\`")
+
+
+class ErrorReport:
+    def __init__(self, error_type: str, origin: str) -> None:
+        self.error_type = error_type
+        self.origin = origin
+
+        self.count = 0
+        self.update_id: int | None = None
+        self.chat_id: int | None = None
+        self.error = ""
+
+    def add(self, update: "Update", error: BaseException) -> None:
+        """Counts the error, keeping details of the latest one."""
+        self.count += 1
+        self.update_id = update.update_id
+        self.chat_id = update.effective_chat.id if update.effective_chat else None
+        self.error = truncate(repr(error), MAX_ERROR_LENGTH)
+
+    def as_text(self) -> str:
+        arguments = [
+            ("count", self.count),
+            ("type(error)", self.error_type),
+            ("origin", self.origin),
+            ("update.update_id", self.update_id),
+            ("update.effective_chat.id", self.chat_id),
+            ("error", self.error),
+        ]
+        return "\n".join(f"{key}: {value}" for key, value in arguments)
+
+
+class ErrorDigest:
+    """Collects error reports per bot and sends them to `ADMIN_CHAT_ID` once per `window` seconds, in the background."""
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+
+        self._reports: dict[int, tuple[ExtBot, dict[str, ErrorReport]]] = {}
+        self._started_at = time.monotonic()
+        self._flush_task: asyncio.Task | None = None
+        self._send_task: asyncio.Task | None = None
+
+    def add(
+        self,
+        bot: "ExtBot",
+        update: "Update",
+        error: BaseException,
+    ) -> None:
+        if config.ADMIN_CHAT_ID is None:
+            return
+
+        error_type = type(error).__qualname__
+        origin = get_error_origin(error)
+        fingerprint = f"{error_type}@{origin}"
+
+        if not self._reports:
+            self._started_at = time.monotonic()
+
+        if bot.id not in self._reports:
+            self._reports[bot.id] = (bot, {})
+
+        reports = self._reports[bot.id][1]
+
+        if fingerprint not in reports:
+            reports[fingerprint] = ErrorReport(error_type=error_type, origin=origin)
+
+        reports[fingerprint].add(update, error)
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = create_detached_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        # Reports added while sending aren't scheduled by `add`, as this task is still running
+        while self._reports:
+            await asyncio.sleep(self.window)
+
+            # Sent in a task of its own, so that `close` cancelling this one doesn't interrupt sending
+            self._send_task = create_detached_task(self.flush())
+            await asyncio.shield(self._send_task)
+
+    async def flush(self) -> None:
+        """Sends collected reports right away, also called before an Application is stopped."""
+        reports, self._reports = self._reports, {}
+        period = time.monotonic() - self._started_at
+        self._started_at = time.monotonic()
+
+        if config.ADMIN_CHAT_ID is None:
+            return
+
+        for bot, bot_reports in reports.values():
+            try:
+                await bot.send_message(
+                    chat_id=config.ADMIN_CHAT_ID,
+                    text=self.format_digest(list(bot_reports.values()), period),
+                    parse_mode="MarkdownV2",
+                    rate_limit_args=Priority.BACKGROUND,
+                )
+            except Exception as e:  # noqa: BLE001
+                main_logger.exception(
+                    {
+                        "msg": "Failed to send error digest",
+                        "bot.id": bot.id,
+                        "error": e,
+                    }
+                )
+
+    async def close(self) -> None:
+        """Cancels the scheduled flush and sends pending reports right away, called on shutdown."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+
+        if self._send_task is not None:
+            await self._send_task
+            self._send_task = None
+
+        await self.flush()
+
+    @staticmethod
+    def format_digest(reports: list[ErrorReport], period: float) -> str:
+        reports = sorted(reports, key=lambda report: report.count, reverse=True)
+        total = sum(report.count for report in reports)
+
+        header = f"Помилки в користувачів \\({total} за {int(period)} с\\):"
+        blocks = [header]
+        length = get_text_length(header)
+
+        for report in reports[:MAX_REPORTS_PER_DIGEST]:
+            block = f"```\n{escape_code(report.as_text())}\n```"
+            length += get_text_length(block) + 2
+
+            if length > MAX_DIGEST_LENGTH:
+                break
+
+            blocks.append(block)
+
+        # Minus the header
+        if (skipped := len(reports) - (len(blocks) - 1)) > 0:
+            blocks.append(f"\\+ ще {skipped} видів помилок")
+
+        return "\n\n".join(blocks)
+
+
+error_digest = ErrorDigest(window=config.ADMIN_ERROR_DIGEST_WINDOW)
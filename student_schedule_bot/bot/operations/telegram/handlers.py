@@ -1,8 +1,10 @@
-import urllib.parse
+import hashlib
+import json
 import uuid
 from typing import TYPE_CHECKING
 
-import pydantic
+from django.core.cache import cache
+from student_schedule_bot.config import config
 from student_schedule_bot.logger import main_logger
 from telegram import Update
 
@@ -11,9 +13,12 @@ from bot.models.user import User
 from bot.operations.schedule.read import get_photo_schedule, get_schedule, get_schedule_item
 from bot.operations.telegram import messages
 from bot.operations.telegram.decorators import handler_decorator
+from bot.operations.telegram.enums import CallbackData, Commands
+from bot.operations.telegram.router import router
 from bot.schemas.schedule.schedule import ScheduleFilters
 
 if TYPE_CHECKING:
+    from telegram import Chat
     from telegram.ext import ContextTypes
 
 
@@ -29,6 +34,23 @@ async def clear_keyboards(
     )
 
 
+def get_chat_info(effective_chat: "Chat") -> dict:
+    """Returns the fields of `TelegramChat` that mirror the Telegram chat."""
+    return {
+        "title": effective_chat.title or f"{effective_chat.first_name} {effective_chat.last_name}",
+        "username": effective_chat.username or "",
+        "additional_info": effective_chat.to_dict(recursive=True),
+    }
+
+
+def get_chat_fingerprint(chat_info: dict) -> str:
+    """Hash of the chat fields, to tell whether the stored chat is outdated without comparing them one by one."""
+    return hashlib.blake2b(
+        json.dumps(chat_info, sort_keys=True, default=str).encode(),
+        digest_size=16,
+    ).hexdigest()
+
+
 async def get_or_create_chat(
     update: "Update",
     *,
@@ -49,11 +71,7 @@ async def get_or_create_chat(
 
     chat, created = await TelegramChat.objects.aupdate_or_create(
         chat_id=effective_chat.id,
-        defaults={
-            "title": effective_chat.title or f"{effective_chat.first_name} {effective_chat.last_name}",
-            "username": effective_chat.username,
-            "additional_info": effective_chat.to_dict(recursive=True),
-        },
+        defaults=get_chat_info(effective_chat),
     )
 
     if created:
@@ -67,33 +85,87 @@ async def get_or_create_chat(
     return chat
 
 
+async def update_chat_if_changed(
+    chat: TelegramChat,
+    chat_info: dict,
+    fingerprint: str,
+) -> None:
+    stored_info = {field: getattr(chat, field) for field in chat_info}
+
+    if get_chat_fingerprint(stored_info) == fingerprint:
+        return
+
+    for field, value in chat_info.items():
+        setattr(chat, field, value)
+
+    await chat.asave(update_fields=[*chat_info, "updated_at"])
+
+
+def get_user_cache_key(chat_id: int) -> str:
+    return f"telegram_user_{chat_id}"
+
+
 async def get_user(
     update: "Update",
     *,
     get_only: bool = False,
 ) -> User:
-    chat = await get_or_create_chat(update, get_only=get_only)
+    """
+    Returns the user of the chat the update came from, creating the chat and the user if needed.
+
+    Users are cached for `TELEGRAM_USER_CACHE_TTL` together with the fingerprint of their chat,
+    so taps on buttons of an unchanged chat don't hit the database at all.
+    Otherwise, the user and the chat are loaded with a single query and the chat is only written if it changed.
+    """
+    if not (effective_chat := update.effective_chat):
+        raise ValueError("Update does not contain an effective chat.")
+
+    chat_info = get_chat_info(effective_chat)
+    fingerprint = get_chat_fingerprint(chat_info)
+    cache_key = get_user_cache_key(effective_chat.id)
 
-    user, created = await User.objects.prefetch_related("telegram_chat").aget_or_create(
-        username=chat.username or str(uuid.uuid4()),
-        telegram_chat=chat,
+    cached: tuple[str, User] | None = cache.get(cache_key)
+    if cached is not None and (get_only or cached[0] == fingerprint):
+        return cached[1]
+
+    user = (
+        await User.objects.select_related("telegram_chat")
+        .filter(
+            telegram_chat__chat_id=effective_chat.id,
+        )
+        .order_by("pk")
+        .afirst()
     )
 
-    if created:
+    if user is None:
+        chat = await get_or_create_chat(update, get_only=get_only)
+
+        user = await User.objects.acreate(
+            username=chat.username or str(uuid.uuid4()),
+            telegram_chat=chat,
+        )
+
         main_logger.debug(
             {
                 "msg": "Created new user",
                 "user.pk": user.pk,
             },
         )
+    elif not get_only:
+        await update_chat_if_changed(user.telegram_chat, chat_info, fingerprint)
+
+    cache.set(cache_key, (fingerprint, user), timeout=config.TELEGRAM_USER_CACHE_TTL)
 
     return user
 
 
+@router.fallback
+@router.route(Commands.SHOW_MAIN_MENU)
 @handler_decorator()
 async def start(
     update: "Update",
     _context: "ContextTypes.DEFAULT_TYPE",
+    _callback_data: CallbackData | None = None,
 ) -> None:
     user = await get_user(update)
 
@@ -103,37 +175,18 @@ async def start(
     )
 
 
-def get_schedule_filters_from_query(callback_query: str) -> ScheduleFilters:
-    filters = ScheduleFilters(page=1)
-
-    pieces = callback_query.split("?")
-
-    if len(pieces) == 1:
-        return filters
-
-    result = urllib.parse.parse_qs(qs="".join(pieces[1:]))
-
-    if "page" in result:
-        filters.page = int(result["page"][0])
-
-    return filters
-
-
+@router.route(Commands.SHOW_SCHEDULE, Commands.SCHEDULE_PAGE)
 @handler_decorator()
 async def show_schedule(
     update: "Update",
     context: "ContextTypes.DEFAULT_TYPE",
+    callback_data: CallbackData,
 ) -> None:
     user = await get_user(update)
 
-    filters = None
-
-    if update.callback_query:
-        filters = get_schedule_filters_from_query(update.callback_query.data or "")
-
     schedule = await get_schedule(
         user=user,
-        filters=filters,
+        filters=ScheduleFilters(page=callback_data.page or 1),
     )
 
     await messages.show_schedule(
@@ -144,30 +197,21 @@ async def show_schedule(
     )
 
 
-def get_item_id_from_query(callback_query: str) -> pydantic.UUID4 | None:
-    pieces = callback_query.split("?")
+def get_item_id_from_query(callback_data: CallbackData) -> uuid.UUID | None:
+    ids = callback_data.ids
 
-    if len(pieces) == 1:
-        return None
-
-    result = urllib.parse.parse_qs(qs="".join(pieces[1:]))
-
-    if "id" in result:
-        return pydantic.UUID4(result["id"][0])  # pyright: ignore[reportCallIssue]
-
-    return None
+    return ids[0] if ids else None
 
 
+@router.route(Commands.SHOW_ITEM)
 @handler_decorator()
 async def show_item(
     update: "Update",
     context: "ContextTypes.DEFAULT_TYPE",
+    callback_data: CallbackData,
 ) -> None:
     # Consider getting user to filter Group schedules by User's group
-    if not update.callback_query:
-        raise ValueError("Update does not contain a callback query.")
-
-    item_id = get_item_id_from_query(update.callback_query.data or "")
+    item_id = get_item_id_from_query(callback_data)
 
     if not item_id:
         raise ValueError("Item ID not found in callback query.")
@@ -184,36 +228,24 @@ async def show_item(
 
 
 def get_photo_schedule_info_from_query(
-    callback_query: str,
-) -> tuple[pydantic.UUID4 | None, pydantic.UUID4 | None]:
-    pieces = callback_query.split("?")
-
-    if len(pieces) == 1:
-        return None, None
+    callback_data: CallbackData,
+) -> tuple[uuid.UUID | None, uuid.UUID | None]:
+    ids = callback_data.ids
 
-    result = urllib.parse.parse_qs(qs="&".join(pieces[1:]))
-
-    photo_id = None
-    item_id = None
-
-    if "id" in result:
-        photo_id = pydantic.UUID4(result["id"][0])  # pyright: ignore[reportCallIssue]
-
-    if "item_id" in result:
-        item_id = pydantic.UUID4(result["item_id"][0])  # pyright: ignore[reportCallIssue]
+    photo_id = ids[0] if ids else None
+    item_id = ids[1] if len(ids) > 1 else None
 
     return photo_id, item_id
 
 
+@router.route(Commands.SHOW_PHOTO_SCHEDULE)
 @handler_decorator()
 async def show_photo_schedule(
     update: "Update",
     context: "ContextTypes.DEFAULT_TYPE",
+    callback_data: CallbackData,
 ) -> None:
-    if not update.callback_query:
-        raise ValueError("Update does not contain a callback query.")
-
-    photo_id, item_id = get_photo_schedule_info_from_query(update.callback_query.data or "")
+    photo_id, item_id = get_photo_schedule_info_from_query(callback_data)
 
     if not photo_id:
         raise ValueError("Photo Schedule ID not found in callback query.")
@@ -225,7 +257,7 @@ async def show_photo_schedule(
     await messages.show_photo_schedule(
         update=update,
         photo_schedule=photo_schedule,
-        item_id=str(item_id) if item_id else None,
+        item_id=item_id,
         context=context,
     )
 
@@ -0,0 +1,42 @@
+"""
+Parsing of webhook request bodies.
+
+The body is decoded once, with `orjson`, and updates of types no handler reacts to
+are dropped right away, before building any telegram objects for them.
+"""
+
+import orjson
+
+from bot.errors.http import InvalidRequestError
+from bot.operations.telegram.bot import get_allowed_updates
+
+# Update fields the handlers react to, webhooks are registered with the same `allowed_updates`.
+# Everything else (edited messages, channel posts, chat member updates, ...) is acknowledged and dropped,
+# it still arrives from webhooks registered without `allowed_updates`.
+HANDLED_UPDATE_TYPES = frozenset(get_allowed_updates())
+
+
+def parse_update(body: bytes) -> dict | None:
+    """Returns the update data, or `None` if the update has no type we handle."""
+    try:
+        update_data = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise InvalidRequestError(
+            message="Invalid update",
+            log_message={
+                "msg": "Failed to decode update",
+                "error": e,
+            },
+            level="warning",
+        ) from e
+
+    if not isinstance(update_data, dict) or "update_id" not in update_data:
+        raise InvalidRequestError(
+            message="Invalid update",
+            level="warning",
+        )
+
+    if HANDLED_UPDATE_TYPES.isdisjoint(update_data):
+        return None
+
+    return update_data
@@ -0,0 +1,80 @@
+"""
+Reuse of Telegram `file_id`s for schedule photos.
+
+Once Telegram has downloaded a photo from the backend, it can be sent again by its `file_id`,
+without Telegram fetching the image from us every time. `file_id`s are only valid for the bot that received them.
+"""
+
+from typing import TYPE_CHECKING
+
+from django.core.cache import cache
+from telegram import InputMediaPhoto
+
+if TYPE_CHECKING:
+    from telegram import Message
+
+    from bot.schemas.schedule.schedule import PhotoItem
+
+FILE_ID_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def get_file_id_cache_key(bot_id: int, photo: "PhotoItem") -> str:
+    return f"telegram_photo_file_id_{bot_id}_{photo.uuid}"
+
+
+def get_photo_media(
+    bot_id: int,
+    photos: list["PhotoItem"],
+) -> tuple[list[InputMediaPhoto], bool]:
+    """
+    Returns media to send for the given photos, and whether any cached `file_id`s were used.
+
+    A cached `file_id` is only used if the photo wasn't updated since it was stored, otherwise its URL is sent.
+    """
+    cached = cache.get_many([get_file_id_cache_key(bot_id, photo) for photo in photos])
+
+    media = []
+    used_cache = False
+
+    for photo in photos:
+        stored = cached.get(get_file_id_cache_key(bot_id, photo))
+
+        if stored is not None and stored["updated_at"] == photo.updated_at.isoformat():
+            media.append(InputMediaPhoto(media=stored["file_id"]))
+            used_cache = True
+        else:
+            media.append(InputMediaPhoto(media=str(photo.file)))
+
+    return media, used_cache
+
+
+def get_url_media(photos: list["PhotoItem"]) -> list[InputMediaPhoto]:
+    return [InputMediaPhoto(media=str(photo.file)) for photo in photos]
+
+
+def remember_file_ids(
+    bot_id: int,
+    photos: list["PhotoItem"],
+    messages: "tuple[Message, ...] | list[Message]",
+) -> None:
+    """Stores `file_id`s Telegram returned for sent photos. Messages of a media group keep the order of the photos."""
+    values = {}
+
+    for photo, message in zip(photos, messages, strict=False):
+        if not message.photo:
+            continue
+
+        values[get_file_id_cache_key(bot_id, photo)] = {
+            # The largest size is the original photo
+            "file_id": message.photo[-1].file_id,
+            "updated_at": photo.updated_at.isoformat(),
+        }
+
+    cache.set_many(values, timeout=FILE_ID_TIMEOUT)
+
+
+def forget_file_ids(
+    bot_id: int,
+    photos: list["PhotoItem"],
+) -> None:
+    cache.delete_many([get_file_id_cache_key(bot_id, photo) for photo in photos])
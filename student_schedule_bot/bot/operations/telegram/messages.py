@@ -1,19 +1,29 @@
 from typing import TYPE_CHECKING
 
 from student_schedule_bot.config import config
-from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, ReplyKeyboardRemove
+from student_schedule_bot.logger import main_logger
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardRemove
+from telegram.error import BadRequest
 
 from bot.models.telegram.chat import TelegramChat
+from bot.operations.telegram import media
 from bot.operations.telegram.enums import Commands
+from bot.operations.telegram.error_reports import error_digest
+from bot.operations.telegram.rendering import PrerenderedInlineKeyboardMarkup, RenderCache, RenderedMessage
 
 if TYPE_CHECKING:
+    import uuid
+
     from telegram import Update
-    from telegram.ext import ContextTypes
+    from telegram.ext import ContextTypes, ExtBot
 
     from bot.models.user import User
     from bot.schemas.schedule.schedule import PhotoSchedule, Schedule, ScheduleResponse
 
 
+render_cache = RenderCache(max_size=config.TELEGRAM_RENDER_CACHE_SIZE)
+
+
 async def clear_reply_keyboard(
     message: str,
     update: "Update",
@@ -95,12 +105,20 @@ async def start(
     )
 
 
-async def show_schedule(
-    update: "Update",
-    user: "User",  # Consider using User entity to show group schedule  # noqa: ARG001
-    schedule: "ScheduleResponse",
-    context: "ContextTypes.DEFAULT_TYPE | None" = None,
-) -> None:
+def get_schedule_render_key(schedule: "ScheduleResponse") -> tuple:
+    return (
+        "schedule",
+        schedule.count,
+        schedule.previous_page_number,
+        schedule.next_page_number,
+        tuple(
+            (item.uuid, item.for_date, bool(item.group_schedules), bool(item.photo_schedule))
+            for item in schedule.results
+        ),
+    )
+
+
+def render_schedule(schedule: "ScheduleResponse") -> RenderedMessage:
     keyboard = []
 
     for item in schedule.results:
@@ -116,7 +134,7 @@ async def show_schedule(
             [
                 InlineKeyboardButton(
                     name,
-                    callback_data=Commands.show_item(item_id=str(item.uuid)),
+                    callback_data=Commands.show_item(item_id=item.uuid),
                 ),
             ]
         )
@@ -144,21 +162,43 @@ async def show_schedule(
 
     keyboard.append([InlineKeyboardButton("🏠 До Головного Меню", callback_data=Commands.SHOW_MAIN_MENU)])
 
-    markup = InlineKeyboardMarkup(keyboard)
-
-    await reply_or_edit(
-        update,
+    return RenderedMessage(
         text=f"Розклад ({schedule.count}):",
-        markup=markup,
-        context=context,
+        markup=PrerenderedInlineKeyboardMarkup(keyboard),
     )
 
 
-async def show_item(
+async def show_schedule(
     update: "Update",
-    schedule_item: "Schedule",
+    user: "User",  # Consider using User entity to show group schedule  # noqa: ARG001
+    schedule: "ScheduleResponse",
     context: "ContextTypes.DEFAULT_TYPE | None" = None,
 ) -> None:
+    rendered = render_cache.get_or_render(
+        get_schedule_render_key(schedule),
+        lambda: render_schedule(schedule),
+    )
+
+    await reply_or_edit(
+        update,
+        text=rendered.text,
+        markup=rendered.markup,
+        context=context,
+    )
+
+
+def get_item_render_key(schedule_item: "Schedule") -> tuple:
+    return (
+        "item",
+        schedule_item.uuid,
+        schedule_item.for_date,
+        schedule_item.updated_at,
+        bool(schedule_item.group_schedules),
+        schedule_item.photo_schedule,
+    )
+
+
+def render_item(schedule_item: "Schedule") -> RenderedMessage:
     # NOTE: Not handling group schedules yet
     group_schedule = "❌" if not schedule_item.group_schedules else "✅"
     photo_schedule = "❌" if not schedule_item.photo_schedule else "✅"
@@ -178,8 +218,8 @@ async def show_item(
                 InlineKeyboardButton(
                     "🖼️ Переглянути Фото Розкладу",
                     callback_data=Commands.show_photo_schedule(
-                        photo_id=str(photo_schedule_id),
-                        item_id=str(schedule_item.uuid),
+                        photo_id=photo_schedule_id,
+                        item_id=schedule_item.uuid,
                     ),
                 ),
             ]
@@ -191,10 +231,26 @@ async def show_item(
         ],
     )
 
+    return RenderedMessage(
+        text=text,
+        markup=PrerenderedInlineKeyboardMarkup(keyboard),
+    )
+
+
+async def show_item(
+    update: "Update",
+    schedule_item: "Schedule",
+    context: "ContextTypes.DEFAULT_TYPE | None" = None,
+) -> None:
+    rendered = render_cache.get_or_render(
+        get_item_render_key(schedule_item),
+        lambda: render_item(schedule_item),
+    )
+
     await reply_or_edit(
         update=update,
-        text=text,
-        markup=InlineKeyboardMarkup(keyboard),
+        text=rendered.text,
+        markup=rendered.markup,
         context=context,
     )
 
@@ -202,7 +258,7 @@ async def show_item(
 async def show_photo_schedule(
     update: "Update",
     photo_schedule: "PhotoSchedule",
-    item_id: str | None = None,
+    item_id: "uuid.UUID | None" = None,
     context: "ContextTypes.DEFAULT_TYPE | None" = None,
 ) -> None:
     keyboard = []
@@ -225,15 +281,35 @@ async def show_photo_schedule(
 
     assert update.effective_message is not None
 
-    messages = await update.effective_message.reply_media_group(
-        media=[
-            InputMediaPhoto(
-                media=str(photo.file),
-            )
-            for photo in photo_schedule.photos
-        ],
-        caption=f"Фото розкладу:\n\nОпис: {photo_schedule.name or 'Без назви'}\nОновлено о: {photo_schedule.updated_at.strftime('%Y-%m-%d %H:%M')}",
-    )
+    bot_id = update.get_bot().id
+    caption = f"Фото розкладу:\n\nОпис: {photo_schedule.name or 'Без назви'}\nОновлено о: {photo_schedule.updated_at.strftime('%Y-%m-%d %H:%M')}"
+
+    photo_media, used_file_ids = media.get_photo_media(bot_id, photo_schedule.photos)
+
+    try:
+        messages = await update.effective_message.reply_media_group(
+            media=photo_media,
+            caption=caption,
+        )
+    except BadRequest as e:
+        if not used_file_ids:
+            raise
+
+        main_logger.warning(
+            {
+                "msg": "Cached file_id was rejected, sending photos by URL",
+                "photo_schedule.uuid": photo_schedule.uuid,
+                "error": e,
+            }
+        )
+        media.forget_file_ids(bot_id, photo_schedule.photos)
+
+        messages = await update.effective_message.reply_media_group(
+            media=media.get_url_media(photo_schedule.photos),
+            caption=caption,
+        )
+
+    media.remember_file_ids(bot_id, photo_schedule.photos, messages)
 
     first = messages[0]
     if len(messages) == 1:
@@ -277,25 +353,13 @@ async def user_error_handler(
 
 
 async def admin_error_handler(
-    bot: "Bot",
+    bot: "ExtBot",
     update: "Update",
     error: Exception,
 ) -> None:
-    admin_chat_id = config.ADMIN_CHAT_ID
-
-    if admin_chat_id is None:
-        return
-
-    arguments = [
-        ("update.update_id", update.update_id),
-        ("update.effective_chat.id", update.effective_chat.id if update.effective_chat else None),
-        ("error", repr(error)),
-    ]
-    error_info = "\n".join(f"{key}: {value}" for key, value in arguments)
-    message_text = f"Помилка в користувача:\n\n```\n{error_info}\n```"
-
-    await bot.send_message(
-        chat_id=admin_chat_id,
-        text=message_text,
-        parse_mode="MarkdownV2",
+    # Reports are sent as a digest in the background, so a failing backend doesn't flood the admin chat
+    error_digest.add(
+        bot=bot,
+        update=update,
+        error=error,
     )
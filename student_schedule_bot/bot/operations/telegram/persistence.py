@@ -0,0 +1,279 @@
+"""
+Persistence backends for python-telegram-bot that store every chat/user entry as a separate record.
+
+Unlike `PicklePersistence`, nothing is loaded up-front: chat and user data is fetched when an update
+touches it (`refresh_*_data`), and only entries whose content actually changed are written back.
+All stored data must be JSON serializable.
+"""
+
+import abc
+import hashlib
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from telegram.ext import BasePersistence, PersistenceInput
+
+from bot.models.telegram.persistence import PersistenceRecord
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - optional dependency
+    redis_asyncio = None
+
+if TYPE_CHECKING:
+    from telegram.ext._utils.types import CDCData, ConversationDict, ConversationKey
+
+Kind = PersistenceRecord.Kind
+
+
+def serialize(data: object) -> str:
+    return json.dumps(
+        data,
+        cls=DjangoJSONEncoder,
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+
+
+class RecordPersistence(BasePersistence[dict, dict, dict]):
+    """
+    Base class for record-based persistence.
+
+    Subclasses only need to implement `_load`, `_store` and `_delete` for a single record.
+    """
+
+    # Digests kept to skip unchanged writes, least recently used ones are forgotten.
+    # A forgotten digest only costs one write of a record that might not have changed.
+    max_digests = 10_000
+
+    def __init__(
+        self,
+        store_data: PersistenceInput | None = None,
+        update_interval: float = 60,
+    ) -> None:
+        super().__init__(
+            store_data=store_data,
+            update_interval=update_interval,
+        )
+
+        # Digests of what the storage currently holds, so unchanged entries are not written again
+        self._digests: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._conversations: dict[str, dict[str, object]] = {}
+
+    @abc.abstractmethod
+    async def _load(self, kind: str, key: str) -> Any | None:  # noqa: ANN401
+        """Returns the data of the record, or `None` if there is no such record."""
+
+    @abc.abstractmethod
+    async def _store(self, kind: str, key: str, data: str) -> None:
+        """Creates or replaces the record with the serialized data."""
+
+    @abc.abstractmethod
+    async def _delete(self, kind: str, key: str) -> None:
+        """Deletes the record, if it exists."""
+
+    def _remember(self, kind: str, key: str, serialized: str) -> bool:
+        """Remembers the stored content of a record. Returns False if it did not change."""
+        digest = hashlib.blake2b(serialized.encode(), digest_size=16).digest()
+
+        if self._digests.get((kind, key)) == digest:
+            self._digests.move_to_end((kind, key))
+            return False
+
+        self._digests[(kind, key)] = digest
+        self._digests.move_to_end((kind, key))
+
+        while len(self._digests) > self.max_digests:
+            self._digests.popitem(last=False)
+
+        return True
+
+    async def _read(self, kind: str, key: str) -> Any | None:  # noqa: ANN401
+        data = await self._load(kind, key)
+
+        # A missing record is equivalent to an empty one, so empty data is not written back
+        self._remember(kind, key, serialize(data if data is not None else {}))
+
+        return data
+
+    async def _write(self, kind: str, key: str, data: object) -> None:
+        serialized = serialize(data)
+
+        if not self._remember(kind, key, serialized):
+            return
+
+        await self._store(kind, key, serialized)
+
+    async def _drop(self, kind: str, key: str) -> None:
+        self._digests.pop((kind, key), None)
+        await self._delete(kind, key)
+
+    # Data is loaded lazily in `refresh_*_data`, so nothing is loaded on initialization
+
+    async def get_user_data(self) -> dict[int, dict]:
+        return {}
+
+    async def get_chat_data(self) -> dict[int, dict]:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return await self._read(Kind.BOT_DATA, "") or {}
+
+    async def get_callback_data(self) -> "CDCData | None":
+        data = await self._read(Kind.CALLBACK_DATA, "")
+
+        if not data:
+            return None
+
+        # JSON has no tuples, but the callback data cache expects them
+        keyboards, button_data = data
+        return [tuple(keyboard) for keyboard in keyboards], button_data
+
+    async def get_conversations(self, name: str) -> "ConversationDict":
+        conversations = await self._read(Kind.CONVERSATION, name) or {}
+        self._conversations[name] = conversations
+
+        return {tuple(json.loads(key)): state for key, state in conversations.items()}
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        await self._write(Kind.USER_DATA, str(user_id), data)
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        await self._write(Kind.CHAT_DATA, str(chat_id), data)
+
+    async def update_bot_data(self, data: dict) -> None:
+        await self._write(Kind.BOT_DATA, "", data)
+
+    async def update_callback_data(self, data: "CDCData") -> None:
+        await self._write(Kind.CALLBACK_DATA, "", data)
+
+    async def update_conversation(
+        self,
+        name: str,
+        key: "ConversationKey",
+        new_state: object | None,
+    ) -> None:
+        conversations = self._conversations.setdefault(name, {})
+
+        if new_state is None:
+            conversations.pop(json.dumps(key), None)
+        else:
+            conversations[json.dumps(key)] = new_state
+
+        await self._write(Kind.CONVERSATION, name, conversations)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        await self._drop(Kind.USER_DATA, str(user_id))
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        await self._drop(Kind.CHAT_DATA, str(chat_id))
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        data = await self._read(Kind.USER_DATA, str(user_id))
+
+        user_data.clear()
+        user_data.update(data or {})
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        data = await self._read(Kind.CHAT_DATA, str(chat_id))
+
+        chat_data.clear()
+        chat_data.update(data or {})
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        # bot_data is loaded once on initialization, refreshing it would cost a query per update
+        pass
+
+    async def flush(self) -> None:
+        # Every update is written right away, there is nothing left to flush
+        pass
+
+
+class DatabasePersistence(RecordPersistence):
+    """Stores records as `PersistenceRecord` rows of the given bot."""
+
+    def __init__(
+        self,
+        bot_id: str,
+        store_data: PersistenceInput | None = None,
+        update_interval: float = 60,
+    ) -> None:
+        super().__init__(
+            store_data=store_data,
+            update_interval=update_interval,
+        )
+        self.bot_id = bot_id
+
+    async def _load(self, kind: str, key: str) -> Any | None:  # noqa: ANN401
+        record = (
+            await PersistenceRecord.objects.filter(
+                bot_id=self.bot_id,
+                kind=kind,
+                key=key,
+            )
+            .only("data")
+            .afirst()
+        )
+
+        return record.data if record else None
+
+    async def _store(self, kind: str, key: str, data: str) -> None:
+        await PersistenceRecord.objects.aupdate_or_create(
+            bot_id=self.bot_id,
+            kind=kind,
+            key=key,
+            defaults={
+                "data": json.loads(data),
+            },
+        )
+
+    async def _delete(self, kind: str, key: str) -> None:
+        await PersistenceRecord.objects.filter(
+            bot_id=self.bot_id,
+            kind=kind,
+            key=key,
+        ).adelete()
+
+
+class RedisPersistence(RecordPersistence):
+    """
+    Stores records as JSON strings in Redis (or anything speaking its protocol).
+
+    Requires the optional `redis` package.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        namespace: str,
+        store_data: PersistenceInput | None = None,
+        update_interval: float = 60,
+    ) -> None:
+        if redis_asyncio is None:
+            raise ImportError("RedisPersistence requires the `redis` extra (`uv sync --extra redis`).")
+
+        super().__init__(
+            store_data=store_data,
+            update_interval=update_interval,
+        )
+        self.namespace = namespace
+        self.client = redis_asyncio.Redis.from_url(url)
+
+    def _make_key(self, kind: str, key: str) -> str:
+        return f"{self.namespace}:{kind}:{key}"
+
+    async def _load(self, kind: str, key: str) -> Any | None:  # noqa: ANN401
+        data = await self.client.get(self._make_key(kind, key))
+
+        return json.loads(data) if data is not None else None
+
+    async def _store(self, kind: str, key: str, data: str) -> None:
+        await self.client.set(self._make_key(kind, key), data)
+
+    async def _delete(self, kind: str, key: str) -> None:
+        await self.client.delete(self._make_key(kind, key))
+
+    async def flush(self) -> None:
+        await self.client.aclose()
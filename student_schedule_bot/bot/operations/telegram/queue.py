@@ -0,0 +1,184 @@
+"""
+Background processing of Telegram webhook updates.
+
+The webhook only validates the bot and enqueues the update, so Telegram gets its answer right away
+no matter how slow the schedule backend is. Updates are sharded between workers by chat,
+so updates of one chat are still processed one at a time and in order.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+from student_schedule_bot.config import config
+from student_schedule_bot.lifespan import register_shutdown
+from student_schedule_bot.logger import main_logger
+
+from bot.errors.http import ServiceUnavailableError
+from bot.operations.telegram.bot import process_webhook_with_bot
+from bot.schemas.metrics import UpdateQueueStats
+
+if TYPE_CHECKING:
+    from bot.models.telegram.bot import Bot as BotModel
+
+
+class QueuedUpdate(NamedTuple):
+    bot_instance: "BotModel"
+    update_data: dict
+    enqueued_at: float
+
+
+def get_ordering_key(update_data: dict) -> int:
+    """
+    Returns the id of the chat (or user, for updates without a chat) the raw update belongs to.
+
+    Works on the raw data, so the update doesn't have to be deserialized before it's enqueued.
+    """
+    for value in update_data.values():
+        if not isinstance(value, dict):
+            continue
+
+        chat = value.get("chat") or (value.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+
+        user = value.get("from") or value.get("user")
+        if user:
+            return user["id"]
+
+    return update_data.get("update_id", 0)
+
+
+class UpdateQueue:
+    """Bounded queue of webhook updates, processed by `workers` background tasks."""
+
+    def __init__(
+        self,
+        workers: int,
+        max_size: int,
+        shutdown_timeout: float,
+    ) -> None:
+        self.workers = workers
+        self.max_size = max_size
+        self.shutdown_timeout = shutdown_timeout
+
+        self.stats = UpdateQueueStats(
+            workers=workers,
+            capacity=workers * max_size,
+        )
+
+        self._queues: list[asyncio.Queue[QueuedUpdate]] = []
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def get_stats(self) -> UpdateQueueStats:
+        self.stats.depth = self.depth
+        return self.stats.model_copy()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+
+        self._queues = [asyncio.Queue(maxsize=self.max_size) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+
+    async def stop(self) -> None:
+        """Waits (up to `shutdown_timeout`) for queued updates to be processed and stops the workers."""
+        if not self.running:
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                timeout=self.shutdown_timeout,
+            )
+        except TimeoutError:
+            main_logger.warning(
+                {
+                    "msg": "Update queue wasn't drained before shutdown",
+                    "depth": self.depth,
+                }
+            )
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        self._queues = []
+        self._tasks = []
+
+    async def put(self, bot_instance: "BotModel", update_data: dict) -> None:
+        """Enqueues an update. Raises `ServiceUnavailableError` if the queue of its chat is full."""
+        await self.start()
+
+        queue = self._queues[hash(get_ordering_key(update_data)) % self.workers]
+
+        try:
+            queue.put_nowait(
+                QueuedUpdate(
+                    bot_instance=bot_instance,
+                    update_data=update_data,
+                    enqueued_at=time.monotonic(),
+                )
+            )
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+
+            # Telegram will deliver the update again later
+            raise ServiceUnavailableError(
+                log_message={
+                    "msg": "Update queue is full",
+                    "bot_id": bot_instance.uuid,
+                    "update_id": update_data.get("update_id"),
+                    "depth": self.depth,
+                },
+                level="warning",
+            ) from None
+
+        self.stats.enqueued += 1
+
+    async def _work(self, queue: asyncio.Queue[QueuedUpdate]) -> None:
+        while True:
+            item = await queue.get()
+
+            lag = time.monotonic() - item.enqueued_at
+            self.stats.last_lag = lag
+            self.stats.max_lag = max(self.stats.max_lag, lag)
+
+            try:
+                await process_webhook_with_bot(
+                    bot_instance=item.bot_instance,
+                    update_data=item.update_data,
+                    recycle_db_connections=True,
+                )
+                self.stats.processed += 1
+            except Exception as e:  # noqa: BLE001
+                self.stats.failed += 1
+
+                main_logger.exception(
+                    {
+                        "msg": "Failed to process queued update",
+                        "bot_id": item.bot_instance.uuid,
+                        "update_id": item.update_data.get("update_id"),
+                        "error": e,
+                    }
+                )
+            finally:
+                queue.task_done()
+
+
+update_queue = UpdateQueue(
+    workers=config.TELEGRAM_UPDATE_WORKERS,
+    max_size=config.TELEGRAM_UPDATE_QUEUE_SIZE,
+    shutdown_timeout=config.TELEGRAM_UPDATE_QUEUE_SHUTDOWN_TIMEOUT,
+)
+
+register_shutdown(update_queue.stop)
@@ -0,0 +1,240 @@
+"""
+Rate limiting of requests to the Bot API.
+
+Telegram allows about 30 messages per second overall, about one per second in a single chat,
+and 20 per minute in a group. Requests over the limits fail with `RetryAfter`, so they are delayed here instead.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Callable, Coroutine
+from datetime import timedelta
+from enum import IntEnum
+from typing import Any
+
+from student_schedule_bot.logger import main_logger
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from bot.schemas.metrics import RateLimitStats
+
+# Telegram counts every photo of an album as a separate message
+MEDIA_GROUP_ENDPOINT = "sendMediaGroup"
+# Once there are more chat buckets than this, idle ones are dropped (a full bucket can be recreated any time)
+MAX_IDLE_CHAT_BUCKETS = 10_000
+
+
+def get_retry_after(error: RetryAfter) -> float:
+    """Returns seconds to wait, `retry_after` is an int up to python-telegram-bot 22.1 and a timedelta later on."""
+    retry_after = error.retry_after
+
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+
+    return float(retry_after)
+
+
+class Priority(IntEnum):
+    """Pass as `rate_limit_args` of `ExtBot` methods, lower values are sent first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+class TokenBucket:
+    """
+    Token bucket, refilled with `rate` tokens per second up to `capacity`.
+
+    Requests that can't get their tokens right away wait in a queue ordered by priority, then arrival.
+    A request costing more than `capacity` (a large media group) waits for a full bucket and takes it into debt,
+    so the requests after it wait until the whole cost is refilled.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+        self._waiters: list[tuple[int, int, float, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._drain_task: asyncio.Task | None = None
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return not self._waiters and self._tokens >= self.capacity
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1, priority: int = Priority.INTERACTIVE) -> bool:
+        """Waits until `tokens` are available and takes them. Returns whether it had to wait."""
+        self._refill()
+        if not self._waiters and self._tokens >= min(tokens, self.capacity):
+            self._tokens -= tokens
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), tokens, future))
+
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain())
+
+        await future
+
+        return True
+
+    async def _drain(self) -> None:
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+
+            if future.done():
+                # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+
+            needed = min(tokens, self.capacity)
+
+            self._refill()
+            if self._tokens >= needed:
+                heapq.heappop(self._waiters)
+                self._tokens -= tokens
+                future.set_result(None)
+                continue
+
+            await asyncio.sleep((needed - self._tokens) / self.rate)
+
+
+class TokenBucketRateLimiter(BaseRateLimiter[int]):
+    """
+    Delays requests to chats (the ones with a `chat_id`) to stay within the global and per-chat limits.
+
+    `rate_limit_args` is the `Priority` of the request. On `RetryAfter`, every request waits until the latest
+    of the given deadlines, and the failed request is retried up to `max_retries` times.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: float,
+        group_rate: float,
+        group_burst: float,
+        max_retries: int,
+        stats: RateLimitStats,
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self.stats = stats
+
+        self._global_bucket = TokenBucket(rate=global_rate, capacity=global_rate)
+        self._chat_buckets: dict[int | str, TokenBucket] = {}
+
+        # `time.monotonic()` until which requests are paused after `RetryAfter`
+        self._paused_until = 0.0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        self._chat_buckets.clear()
+
+    def _get_chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        if (bucket := self._chat_buckets.get(chat_id)) is not None:
+            return bucket
+
+        if len(self._chat_buckets) >= MAX_IDLE_CHAT_BUCKETS:
+            self._chat_buckets = {key: bucket for key, bucket in self._chat_buckets.items() if not bucket.idle}
+
+        # Groups and channels have negative ids (or usernames)
+        is_group = isinstance(chat_id, str) or chat_id < 0
+
+        bucket = self._chat_buckets[chat_id] = TokenBucket(
+            rate=self.group_rate if is_group else self.chat_rate,
+            capacity=self.group_burst if is_group else self.chat_burst,
+        )
+
+        return bucket
+
+    async def _wait_for_tokens(
+        self,
+        endpoint: str,
+        data: dict[str, Any],
+        priority: int,
+    ) -> None:
+        chat_id = data.get("chat_id")
+
+        if chat_id is None:
+            return
+
+        started_at = time.monotonic()
+
+        tokens = len(data.get("media") or ()) if endpoint == MEDIA_GROUP_ENDPOINT else 1
+        tokens = max(tokens, 1)
+
+        waited_for_chat = await self._get_chat_bucket(chat_id).acquire(tokens, priority)
+        waited_for_global = await self._global_bucket.acquire(tokens, priority)
+
+        if waited_for_chat or waited_for_global:
+            self.stats.delayed += 1
+            self.stats.wait_time += time.monotonic() - started_at
+
+    async def process_request(  # noqa: PLR0913, PLR0917
+        self,
+        callback: Callable[..., Coroutine[Any, Any, bool | dict | list[dict]]],
+        args: Any,  # noqa: ANN401
+        kwargs: dict[str, Any],
+        endpoint: str,
+        data: dict[str, Any],
+        rate_limit_args: int | None,
+    ) -> bool | dict | list[dict]:
+        priority = Priority.INTERACTIVE if rate_limit_args is None else rate_limit_args
+
+        self.stats.requests += 1
+
+        await self._wait_for_tokens(endpoint, data, priority)
+
+        attempt = 0
+
+        while True:
+            # The deadline can be pushed back while sleeping, an event would resume at the first deadline
+            while (pause := self._paused_until - time.monotonic()) > 0:  # noqa: ASYNC110
+                await asyncio.sleep(pause)
+
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self.stats.retry_after += 1
+
+                if attempt >= self.max_retries:
+                    raise
+
+                retry_after = get_retry_after(e)
+
+                main_logger.warning(
+                    {
+                        "msg": "Telegram rate limit hit, pausing requests",
+                        "endpoint": endpoint,
+                        "retry_after": retry_after,
+                        "attempt": attempt,
+                    }
+                )
+
+                # A shorter `RetryAfter` of a concurrent request must not end the pause early
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after + 0.1)
+
+                attempt += 1
+                self.stats.retries += 1
+
+
+rate_limit_stats = RateLimitStats()
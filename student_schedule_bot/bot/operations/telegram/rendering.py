@@ -0,0 +1,79 @@
+"""
+Cache of rendered message texts and keyboards.
+
+Schedule pages and items are rendered from cached backend data, so the same page is rendered over and over again.
+Keys are tuples of everything a rendered message depends on, so an entry is never outdated, only evicted.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import NamedTuple
+
+from telegram import InlineKeyboardMarkup
+
+
+class PrerenderedInlineKeyboardMarkup(InlineKeyboardMarkup):
+    """Keyboard that is serialized only once, as cached keyboards are sent many times without changes."""
+
+    __slots__ = ("_serialized",)
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
+        super().__init__(*args, **kwargs)
+
+        with self._unfrozen():
+            self._serialized: dict | None = None
+
+    def to_dict(self, recursive: bool = True) -> dict:
+        if not recursive:
+            return super().to_dict(recursive=recursive)
+
+        if self._serialized is None:
+            with self._unfrozen():
+                self._serialized = super().to_dict()
+
+        return self._serialized
+
+
+class RenderedMessage(NamedTuple):
+    text: str
+    markup: InlineKeyboardMarkup
+
+
+class RenderCache:
+    """Process-local LRU cache of rendered messages."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._messages: OrderedDict[Hashable, RenderedMessage] = OrderedDict()
+
+    def get_or_render(
+        self,
+        key: Hashable,
+        render: Callable[[], RenderedMessage],
+    ) -> RenderedMessage:
+        if (message := self._messages.get(key)) is not None:
+            self.hits += 1
+            self._messages.move_to_end(key)
+            return message
+
+        self.misses += 1
+        message = render()
+
+        if self.max_size > 0:
+            self._messages[key] = message
+
+            if len(self._messages) > self.max_size:
+                self._messages.popitem(last=False)
+
+        return message
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "size": len(self._messages),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,84 @@
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from telegram.ext import CallbackQueryHandler
+
+from bot.operations.telegram.enums import CallbackData, Commands
+
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import ContextTypes
+
+# Routed handlers get the decoded callback data, so it's decoded only once
+CommandCallback = Callable[["Update", "ContextTypes.DEFAULT_TYPE", CallbackData], Awaitable[Any]]
+FallbackCallback = Callable[["Update", "ContextTypes.DEFAULT_TYPE"], Awaitable[Any]]
+
+
+class CommandRouter:
+    """
+    Dispatches callback queries to handlers by the command tag of their callback data.
+
+    Registered as a single `CallbackQueryHandler`, so dispatching is one dict lookup
+    no matter how many commands there are, instead of trying a pattern of every handler in turn.
+    """
+
+    def __init__(self) -> None:
+        self._routes: dict[Commands, CommandCallback] = {}
+        self._fallback: FallbackCallback | None = None
+
+    def route(self, *commands: Commands) -> Callable[[CommandCallback], CommandCallback]:
+        """Registers the decorated handler for the given commands."""
+
+        def decorator(callback: CommandCallback) -> CommandCallback:
+            for command in commands:
+                if command in self._routes:
+                    raise ValueError(f"Command {command.name} is already routed.")
+
+                self._routes[command] = callback
+
+            return callback
+
+        return decorator
+
+    def fallback(self, callback: FallbackCallback) -> FallbackCallback:
+        """Registers the decorated handler for callback data that doesn't decode (e.g. of outdated buttons)."""
+        self._fallback = callback
+        return callback
+
+    def resolve(self, callback_data: object) -> tuple[CommandCallback, CallbackData] | None:
+        """Returns the handler and the decoded data, or `None` if it should go to the fallback."""
+        if not isinstance(callback_data, str):
+            return None
+
+        try:
+            decoded = CallbackData.decode(callback_data)
+        except ValueError:
+            return None
+
+        callback = self._routes.get(decoded.command)
+
+        return None if callback is None else (callback, decoded)
+
+    async def dispatch(
+        self,
+        update: "Update",
+        context: "ContextTypes.DEFAULT_TYPE",
+    ) -> None:
+        assert update.callback_query is not None
+
+        route = self.resolve(update.callback_query.data)
+
+        # Stops the loading indicator on the button right away
+        await update.callback_query.answer()
+
+        if route is not None:
+            callback, callback_data = route
+            await callback(update, context, callback_data)
+        elif self._fallback is not None:
+            await self._fallback(update, context)
+
+    def as_handler(self) -> CallbackQueryHandler:
+        return CallbackQueryHandler(self.dispatch)
+
+
+router = CommandRouter()
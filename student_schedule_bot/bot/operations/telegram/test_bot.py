@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from bot.models.telegram.bot import Bot
+from bot.operations.telegram import bot as telegram_bot
+
+
+def test_update_that_failed_to_process_is_not_dropped_as_duplicate(monkeypatch: pytest.MonkeyPatch) -> None:
+    bot_instance = Bot(name="test", token="1:test")
+    update_data = {"update_id": 1, "message": {}}
+    attempts = []
+
+    async def get_bot(bot_instance: Bot) -> None:
+        attempts.append(bot_instance)
+        raise RuntimeError("Application failed to start")
+
+    monkeypatch.setattr(telegram_bot, "get_bot", get_bot)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(telegram_bot.process_webhook_with_bot(bot_instance, update_data))
+
+    assert len(attempts) == 2  # noqa: PLR2004
+    assert not telegram_bot.is_duplicate_update(bot_instance, update_data)
+    assert telegram_bot.is_duplicate_update(bot_instance, update_data)
@@ -0,0 +1,70 @@
+import string
+import uuid
+
+import pytest
+
+from bot.operations.telegram.enums import COMMANDS_BY_TAG, PAGED_COMMANDS, CallbackData, Commands
+
+# Telegram's limit of callback data, in bytes
+MAX_CALLBACK_DATA_SIZE = 64
+
+
+def get_examples(command: Commands) -> list[CallbackData]:
+    if command in PAGED_COMMANDS:
+        return [CallbackData(command, page=page) for page in (1, 255, 256, 10**6)]
+
+    return [CallbackData(command, ids=tuple(uuid.uuid4() for _ in range(count))) for count in range(3)]
+
+
+@pytest.mark.parametrize("command", list(Commands))
+def test_round_trip(command: Commands) -> None:
+    for callback_data in get_examples(command):
+        encoded = callback_data.encode()
+
+        assert len(encoded.encode()) <= MAX_CALLBACK_DATA_SIZE
+        assert CallbackData.decode(encoded) == callback_data
+
+
+def test_button_helpers_round_trip() -> None:
+    photo_id, item_id = uuid.uuid4(), uuid.uuid4()
+
+    assert CallbackData.decode(Commands.schedule_page(3)) == CallbackData(Commands.SCHEDULE_PAGE, page=3)
+    assert CallbackData.decode(Commands.show_item(item_id)) == CallbackData(Commands.SHOW_ITEM, ids=(item_id,))
+    assert CallbackData.decode(Commands.show_photo_schedule(photo_id, item_id)) == CallbackData(
+        Commands.SHOW_PHOTO_SCHEDULE,
+        ids=(photo_id, item_id),
+    )
+    assert CallbackData.decode(Commands.show_photo_schedule(photo_id, None)) == CallbackData(
+        Commands.SHOW_PHOTO_SCHEDULE,
+        ids=(photo_id,),
+    )
+
+
+def test_tags_are_unique_single_characters() -> None:
+    assert len(COMMANDS_BY_TAG) == len(Commands)
+    assert all(len(tag) == 1 for tag in COMMANDS_BY_TAG)
+
+
+def test_legacy_callback_data_matches_no_command() -> None:
+    # Buttons of `arbitrary_callback_data` carry two UUIDs as 64 hex characters
+    assert not set(COMMANDS_BY_TAG) & set(string.hexdigits)
+
+    legacy = uuid.uuid4().hex + uuid.uuid4().hex
+
+    with pytest.raises(ValueError, match="Unknown callback data command"):
+        CallbackData.decode(legacy)
+
+
+@pytest.mark.parametrize(
+    "callback_data",
+    [
+        "",
+        f"{Commands.SHOW_ITEM.value}AAAA",
+        f"{Commands.SHOW_ITEM.value}!!!",
+        # Standard base64 characters aren't part of the urlsafe alphabet
+        f"{Commands.SHOW_ITEM.value}++++",
+    ],
+)
+def test_invalid_callback_data(callback_data: str) -> None:
+    with pytest.raises(ValueError):
+        CallbackData.decode(callback_data)
@@ -0,0 +1,168 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from student_schedule_bot.config import config
+
+from bot.operations.telegram.bot import ApplicationRegistry
+from bot.operations.telegram.error_reports import (
+    MAX_REPORTS_PER_DIGEST,
+    ErrorDigest,
+    ErrorReport,
+    error_digest,
+    get_text_length,
+)
+
+ADMIN_CHAT_ID = "-100"
+
+
+class FakeBot:
+    """
+    Records digests it sends.
+
+    If `held`, sending sets `sending` and waits for `release` (e.g. as if waiting in the rate limiter).
+    """
+
+    def __init__(self, events: list[str] | None = None, *, held: bool = False) -> None:
+        self.id = 1
+        self.events = [] if events is None else events
+        self.sent: list[str] = []
+
+        self.sending = asyncio.Event()
+        self.release = asyncio.Event()
+        if not held:
+            self.release.set()
+
+    async def send_message(self, text: str, **kwargs: object) -> None:  # noqa: ARG002
+        self.sending.set()
+        await self.release.wait()
+        self.sent.append(text)
+        self.events.append("sent")
+
+
+def make_update(update_id: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(update_id=update_id, effective_chat=SimpleNamespace(id=42))
+
+
+def raise_error(error: Exception) -> Exception:
+    try:
+        raise error
+    except Exception as e:  # noqa: BLE001
+        return e
+
+
+@pytest.fixture(autouse=True)
+def admin_chat(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "ADMIN_CHAT_ID", ADMIN_CHAT_ID)
+
+
+def test_errors_are_aggregated_into_one_digest() -> None:
+    bot = FakeBot()
+    digest = ErrorDigest(window=0)
+
+    async def run() -> None:
+        for update_id in range(30):
+            digest.add(bot, make_update(update_id), raise_error(RuntimeError("Backend is down")))
+
+        await digest._flush_task  # noqa: SLF001
+
+    asyncio.run(run())
+
+    assert len(bot.sent) == 1
+    assert "count: 30" in bot.sent[0]
+
+
+def test_reports_added_while_sending_are_sent_later() -> None:
+    bot = FakeBot(held=True)
+    digest = ErrorDigest(window=0)
+
+    async def run() -> None:
+        digest.add(bot, make_update(1), raise_error(RuntimeError("first")))
+
+        await bot.sending.wait()
+        digest.add(bot, make_update(2), raise_error(ValueError("second")))
+        bot.release.set()
+
+        await digest._flush_task  # noqa: SLF001
+
+    asyncio.run(run())
+
+    assert len(bot.sent) == 2  # noqa: PLR2004
+    assert "RuntimeError" in bot.sent[0]
+    assert "ValueError" in bot.sent[1]
+
+
+def test_close_sends_pending_reports_right_away() -> None:
+    bot = FakeBot()
+    digest = ErrorDigest(window=3600)
+
+    async def run() -> asyncio.Task:
+        digest.add(bot, make_update(), raise_error(RuntimeError("Backend is down")))
+        flush_task = digest._flush_task  # noqa: SLF001
+
+        await digest.close()
+
+        return flush_task
+
+    flush_task = asyncio.run(run())
+
+    assert len(bot.sent) == 1
+    assert flush_task.cancelled()
+
+
+def test_close_waits_for_the_digest_being_sent() -> None:
+    bot = FakeBot(held=True)
+    digest = ErrorDigest(window=0)
+
+    async def run() -> None:
+        digest.add(bot, make_update(), raise_error(RuntimeError("Backend is down")))
+        await bot.sending.wait()
+
+        close_task = asyncio.create_task(digest.close())
+        await asyncio.sleep(0)
+        assert not close_task.done()
+
+        bot.release.set()
+        await close_task
+
+    asyncio.run(run())
+
+    assert len(bot.sent) == 1
+
+
+def test_digest_fits_into_one_message() -> None:
+    reports = []
+
+    for i in range(MAX_REPORTS_PER_DIGEST + 5):
+        report = ErrorReport(error_type=f"RuntimeError{i}", origin="bot/operations/schedule/cache.py:1 (check)")
+        # Errors of `check_response` embed the whole backend response
+        report.add(make_update(i), RuntimeError({"response.content": "😱" * 10_000}))
+        reports.append(report)
+
+    text = ErrorDigest.format_digest(reports, period=60)
+
+    assert get_text_length(text) <= 4096  # noqa: PLR2004
+    assert text.count("```") % 2 == 0
+    assert text.endswith("видів помилок")
+
+
+def test_pending_reports_are_sent_before_applications_stop() -> None:
+    events: list[str] = []
+    bot = FakeBot(events)
+
+    class FakeApplication:
+        running = False
+
+        async def shutdown(self) -> None:
+            events.append("stopped")
+
+    registry = ApplicationRegistry()
+    registry._applications["bot"] = ("1:test", FakeApplication())  # noqa: SLF001
+
+    async def run() -> None:
+        error_digest.add(bot, make_update(), raise_error(RuntimeError("Backend is down")))
+        await registry.shutdown()
+
+    asyncio.run(run())
+
+    assert events == ["sent", "stopped"]
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from telegram import Update
+from telegram.ext import Application, ContextTypes, MessageHandler, filters
+
+from bot.operations.telegram.conftest import FakeBotApi
+from bot.operations.telegram.persistence import Kind, RecordPersistence
+
+if TYPE_CHECKING:
+    from telegram.ext import BasePersistence
+
+CHAT_ID = 1_000
+OTHER_CHATS = 100
+
+
+class MemoryPersistence(RecordPersistence):
+    """Keeps records in a dict, recording every call of the storage methods."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: dict[tuple[str, str], Any] = {}
+        self.loads: list[tuple[str, str]] = []
+        self.stores: list[tuple[str, str]] = []
+
+    async def _load(self, kind: str, key: str) -> Any | None:  # noqa: ANN401
+        self.loads.append((kind, key))
+        return self.records.get((kind, key))
+
+    async def _store(self, kind: str, key: str, data: str) -> None:
+        self.stores.append((kind, key))
+        self.records[(kind, key)] = json.loads(data)
+
+    async def _delete(self, kind: str, key: str) -> None:
+        self.records.pop((kind, key), None)
+
+
+async def count_visits(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_message.text == "visit":
+        context.chat_data["visits"] = context.chat_data.get("visits", 0) + 1
+
+
+def get_update(update_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": CHAT_ID, "type": "private"},
+            "from": {"id": CHAT_ID, "is_bot": False, "first_name": "Student"},
+            "text": text,
+        },
+    }
+
+
+def build_application(persistence: "BasePersistence") -> Application:
+    application = (
+        Application.builder()
+        .token("1:test")
+        .request(FakeBotApi())
+        .get_updates_request(FakeBotApi())
+        .persistence(persistence)
+        .build()
+    )
+    application.add_handler(MessageHandler(filters.TEXT, count_visits))
+
+    return application
+
+
+def test_only_the_touched_chat_is_loaded_and_only_changes_are_written() -> None:
+    persistence = MemoryPersistence()
+    persistence.records = {(Kind.CHAT_DATA, str(chat_id)): {"visits": 1} for chat_id in range(OTHER_CHATS)}
+
+    application = build_application(persistence)
+
+    async def process(update_id: int, text: str) -> None:
+        persistence.loads.clear()
+        persistence.stores.clear()
+
+        await application.process_update(Update.de_json(get_update(update_id, text), bot=application.bot))
+        await application.update_persistence()
+
+    async def run() -> None:
+        async with application:
+            # Nothing per chat is loaded on initialization
+            assert all(kind not in {Kind.CHAT_DATA, Kind.USER_DATA} for kind, _ in persistence.loads)
+
+            await process(1, "visit")
+            assert sorted(persistence.loads) == [(Kind.CHAT_DATA, str(CHAT_ID)), (Kind.USER_DATA, str(CHAT_ID))]
+            assert persistence.stores == [(Kind.CHAT_DATA, str(CHAT_ID))]
+
+            # The same chat again, without any change: loaded again, but nothing is written
+            await process(2, "hello")
+            assert sorted(persistence.loads) == [(Kind.CHAT_DATA, str(CHAT_ID)), (Kind.USER_DATA, str(CHAT_ID))]
+            assert persistence.stores == []
+
+    asyncio.run(run())
+
+    assert persistence.records[(Kind.CHAT_DATA, str(CHAT_ID))] == {"visits": 1}
+
+
+def test_digests_are_bounded() -> None:
+    persistence = MemoryPersistence()
+    persistence.max_digests = 10
+
+    async def run() -> None:
+        for chat_id in range(OTHER_CHATS):
+            await persistence.update_chat_data(chat_id, {"visits": 1})
+
+        # The most recently written chat is still known to be unchanged, the first one was forgotten
+        await persistence.update_chat_data(OTHER_CHATS - 1, {"visits": 1})
+        await persistence.update_chat_data(0, {"visits": 1})
+
+    asyncio.run(run())
+
+    assert len(persistence._digests) == persistence.max_digests  # noqa: SLF001
+    assert persistence.stores[-1] == (Kind.CHAT_DATA, "0")
+    assert len(persistence.stores) == OTHER_CHATS + 1
+
+
+def test_storage_methods_are_abstract() -> None:
+    class IncompletePersistence(RecordPersistence):
+        async def _load(self, kind: str, key: str) -> None:
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompletePersistence()
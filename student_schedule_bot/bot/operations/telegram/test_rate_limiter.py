@@ -0,0 +1,161 @@
+import asyncio
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+from telegram.error import RetryAfter
+from telegram.ext import ExtBot
+
+from bot.operations.telegram.rate_limiter import Priority, TokenBucket, TokenBucketRateLimiter, get_retry_after
+from bot.schemas.metrics import RateLimitStats
+
+if TYPE_CHECKING:
+    from bot.operations.telegram.conftest import FakeBotApi
+
+CHAT_ID = 42
+
+
+def make_bot(fake_bot_api: "FakeBotApi", **limits: float) -> tuple[ExtBot, RateLimitStats]:
+    stats = RateLimitStats()
+    rate_limiter = TokenBucketRateLimiter(
+        **{
+            "global_rate": 30,
+            "chat_rate": 1,
+            "chat_burst": 3,
+            "group_rate": 20 / 60,
+            "group_burst": 3,
+            "max_retries": 2,
+            **limits,
+        },
+        stats=stats,
+    )
+
+    bot = ExtBot(
+        token="1:test",
+        request=fake_bot_api,
+        get_updates_request=fake_bot_api,
+        rate_limiter=rate_limiter,
+    )
+
+    return bot, stats
+
+
+@pytest.mark.parametrize("retry_after", [3, timedelta(seconds=3)])
+def test_get_retry_after(retry_after: int | timedelta) -> None:
+    # `RetryAfter.retry_after` is an int up to python-telegram-bot 22.1, a timedelta in later versions
+    assert get_retry_after(SimpleNamespace(retry_after=retry_after)) == 3  # noqa: PLR2004
+
+
+def test_flood_control_is_retried(fake_bot_api: "FakeBotApi") -> None:
+    fake_bot_api.fail("sendMessage", 429, "Too Many Requests: retry after 1", retry_after=1)
+    bot, stats = make_bot(fake_bot_api)
+
+    async def run() -> None:
+        async with bot:
+            message = await bot.send_message(chat_id=CHAT_ID, text="Розклад")
+            assert message.text == "Розклад"
+
+    asyncio.run(run())
+
+    assert fake_bot_api.count("sendMessage") == 2  # noqa: PLR2004
+    assert stats.retry_after == 1
+    assert stats.retries == 1
+
+
+def test_flood_control_waits_for_the_latest_deadline(fake_bot_api: "FakeBotApi") -> None:
+    fake_bot_api.fail("sendMessage", 429, "Too Many Requests: retry after 2", retry_after=2)
+    fake_bot_api.fail("sendChatAction", 429, "Too Many Requests: retry after 1", retry_after=1)
+    fake_bot_api.latency = 0.01
+    bot, stats = make_bot(fake_bot_api)
+
+    async def run() -> float:
+        async with bot:
+            started_at = time.monotonic()
+
+            async def send_chat_action() -> float:
+                await bot.send_chat_action(chat_id=CHAT_ID + 1, action="typing")
+                return time.monotonic() - started_at
+
+            _, chat_action_time = await asyncio.gather(
+                bot.send_message(chat_id=CHAT_ID, text="Розклад"),
+                send_chat_action(),
+            )
+
+            return chat_action_time
+
+    # The shorter pause doesn't resume requests while the longer one is still running
+    assert asyncio.run(run()) >= 2  # noqa: PLR2004
+    assert stats.retries == 2  # noqa: PLR2004
+
+
+def test_flood_control_is_raised_after_max_retries(fake_bot_api: "FakeBotApi") -> None:
+    fake_bot_api.fail("sendMessage", 429, "Too Many Requests: retry after 1", retry_after=1)
+    bot, stats = make_bot(fake_bot_api, max_retries=0)
+
+    async def run() -> None:
+        async with bot:
+            await bot.send_message(chat_id=CHAT_ID, text="Розклад")
+
+    with pytest.raises(RetryAfter):
+        asyncio.run(run())
+
+    assert fake_bot_api.count("sendMessage") == 1
+    assert stats.retries == 0
+
+
+def test_costs_over_capacity_are_charged_in_full() -> None:
+    async def run() -> float:
+        bucket = TokenBucket(rate=100, capacity=3)
+
+        # A media group of 10 photos doesn't wait for a full bucket, but the next request waits for all 10 tokens
+        assert not await bucket.acquire(10)
+
+        started_at = time.monotonic()
+        assert await bucket.acquire(1)
+
+        return time.monotonic() - started_at
+
+    assert asyncio.run(run()) >= (10 - 3 + 1) / 100 * 0.9
+
+
+def test_interactive_requests_go_first(fake_bot_api: "FakeBotApi") -> None:
+    # One message at once per chat, 50 per second
+    bot, stats = make_bot(fake_bot_api, chat_rate=50, chat_burst=1)
+
+    async def run() -> None:
+        async with bot:
+            background = [
+                asyncio.ensure_future(
+                    bot.send_message(chat_id=CHAT_ID, text=f"background {i}", rate_limit_args=Priority.BACKGROUND)
+                )
+                for i in range(3)
+            ]
+            await asyncio.sleep(0)
+
+            interactive = bot.send_message(chat_id=CHAT_ID, text="interactive")
+
+            await asyncio.gather(*background, interactive)
+
+    asyncio.run(run())
+
+    sent = [parameters["text"] for method, parameters in fake_bot_api.requests if method == "sendMessage"]
+
+    assert sent == ["background 0", "interactive", "background 1", "background 2"]
+    # Every call goes through the limiter (`getMe` included), only messages to the chat wait
+    assert stats.requests == len(fake_bot_api.requests)
+    assert stats.delayed == 3  # noqa: PLR2004
+    assert stats.wait_time > 0
+
+
+def test_requests_without_chat_are_not_limited(fake_bot_api: "FakeBotApi") -> None:
+    bot, stats = make_bot(fake_bot_api, global_rate=1, chat_rate=1, chat_burst=1)
+
+    async def run() -> None:
+        async with bot:
+            await asyncio.gather(*(bot.delete_my_commands() for _ in range(5)))
+
+    asyncio.run(run())
+
+    assert stats.delayed == 0
@@ -0,0 +1,70 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from bot.operations.telegram.enums import CallbackData, Commands
+from bot.operations.telegram.router import CommandRouter
+
+
+class FakeCallbackQuery:
+    def __init__(self, data: str) -> None:
+        self.data = data
+        self.answered = False
+
+    async def answer(self) -> None:
+        self.answered = True
+
+
+def dispatch(router: CommandRouter, data: str) -> tuple[FakeCallbackQuery, list[tuple]]:
+    calls = []
+
+    @router.fallback
+    async def fallback(update: SimpleNamespace, context: None) -> None:  # noqa: ARG001
+        calls.append(("fallback",))
+
+    callback_query = FakeCallbackQuery(data)
+    asyncio.run(router.dispatch(SimpleNamespace(callback_query=callback_query), None))
+
+    return callback_query, calls
+
+
+@pytest.fixture
+def router() -> CommandRouter:
+    router = CommandRouter()
+
+    @router.route(Commands.SHOW_ITEM)
+    async def show_item(update: SimpleNamespace, context: None, callback_data: CallbackData) -> None:  # noqa: ARG001
+        update.callback_query.routed = callback_data
+
+    return router
+
+
+def test_routes_decoded_data(router: CommandRouter) -> None:
+    item_id = uuid.uuid4()
+
+    callback_query, calls = dispatch(router, Commands.show_item(item_id))
+
+    assert callback_query.answered
+    assert callback_query.routed == CallbackData(Commands.SHOW_ITEM, ids=(item_id,))
+    assert calls == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        # Buttons of `arbitrary_callback_data`
+        uuid.uuid4().hex + uuid.uuid4().hex,
+        # Known tag, but the payload doesn't decode
+        f"{Commands.SHOW_ITEM.value}!!!",
+        # Known command without a route
+        Commands.SHOW_MAIN_MENU.value,
+    ],
+)
+def test_undecodable_data_goes_to_fallback(router: CommandRouter, data: str) -> None:
+    callback_query, calls = dispatch(router, data)
+
+    assert callback_query.answered
+    assert not hasattr(callback_query, "routed")
+    assert calls == [("fallback",)]
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from asgiref.sync import ThreadSensitiveContext
+
+from bot.models.telegram.bot import Bot
+from bot.operations.telegram.timings import UpdateTimings, create_detached_task, current_timings, time_thread_hops
+
+QUERIES = 3
+
+pytestmark = pytest.mark.usefixtures("django_db")
+
+
+async def run_queries(count: int = QUERIES) -> None:
+    for _ in range(count):
+        await Bot.objects.acount()
+
+
+async def process_update(timings: UpdateTimings) -> None:
+    token = current_timings.set(timings)
+
+    try:
+        time_thread_hops()
+        await run_queries()
+    finally:
+        current_timings.reset(token)
+
+
+def test_thread_hops_are_timed_outside_of_a_request() -> None:
+    timings = UpdateTimings()
+    asyncio.run(process_update(timings))
+
+    assert timings.thread_hops == QUERIES
+    assert timings.queries == QUERIES
+    assert timings.thread_wait_time > 0
+
+
+def test_thread_hops_are_timed_within_a_request() -> None:
+    timings = UpdateTimings()
+
+    async def run() -> None:
+        # What Django's ASGI handler does for every request
+        async with ThreadSensitiveContext():
+            await run_queries(1)
+            await process_update(timings)
+
+    asyncio.run(run())
+
+    assert timings.thread_hops == QUERIES
+    assert timings.queries == QUERIES
+
+
+def test_detached_tasks_are_not_attributed_to_the_update() -> None:
+    timings = UpdateTimings()
+
+    async def run() -> None:
+        token = current_timings.set(timings)
+
+        try:
+            time_thread_hops()
+            task = create_detached_task(run_queries())
+        finally:
+            current_timings.reset(token)
+
+        await task
+
+    asyncio.run(run())
+
+    assert timings.queries == 0
+    assert timings.thread_hops == 0
@@ -0,0 +1,70 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+from telegram import Bot
+from telegram.request import HTTPXRequest
+
+from bot.operations.telegram.webhook_reply import WebhookReply, WebhookReplyRequest, current_webhook_reply
+
+if TYPE_CHECKING:
+    from bot.operations.telegram.conftest import FakeBotApi
+
+CHAT_ID = 42
+
+
+@pytest.fixture
+def bot(fake_bot_api: "FakeBotApi", monkeypatch: pytest.MonkeyPatch) -> Bot:
+    # Whatever `WebhookReplyRequest` doesn't capture goes to the fake instead of the network
+    monkeypatch.setattr(HTTPXRequest, "do_request", fake_bot_api.do_request)
+
+    return Bot(token="1:test", request=WebhookReplyRequest())
+
+
+def test_first_callback_answer_is_returned_in_the_response(bot: Bot, fake_bot_api: "FakeBotApi") -> None:
+    reply = WebhookReply(max_delay=3600)
+
+    async def run() -> dict | None:
+        token = current_webhook_reply.set(reply)
+
+        try:
+            assert await bot.answer_callback_query("first")
+            await bot.edit_message_text("Розклад", chat_id=CHAT_ID, message_id=1)
+            assert await bot.answer_callback_query("second")
+        finally:
+            current_webhook_reply.reset(token)
+
+        return reply.take()
+
+    assert asyncio.run(run()) == {"method": "answerCallbackQuery", "callback_query_id": "first"}
+    assert [method for method, _ in fake_bot_api.requests] == ["editMessageText", "answerCallbackQuery"]
+    assert fake_bot_api.requests[1][1] == {"callback_query_id": "second"}
+
+
+def test_callback_answer_is_sent_if_the_handler_takes_too_long(bot: Bot, fake_bot_api: "FakeBotApi") -> None:
+    reply = WebhookReply(max_delay=0)
+
+    async def run() -> dict | None:
+        token = current_webhook_reply.set(reply)
+
+        try:
+            assert await bot.answer_callback_query("first")
+            # The handler is still busy (e.g. fetching the schedule) when the delay runs out
+            await reply._timer  # noqa: SLF001
+            assert await bot.answer_callback_query("second")
+        finally:
+            current_webhook_reply.reset(token)
+
+        return reply.take()
+
+    assert asyncio.run(run()) is None
+    assert fake_bot_api.requests == [
+        ("answerCallbackQuery", {"callback_query_id": "first"}),
+        ("answerCallbackQuery", {"callback_query_id": "second"}),
+    ]
+
+
+def test_everything_is_sent_outside_of_a_webhook(bot: Bot, fake_bot_api: "FakeBotApi") -> None:
+    asyncio.run(bot.answer_callback_query("first"))
+
+    assert fake_bot_api.count("answerCallbackQuery") == 1
@@ -0,0 +1,163 @@
+"""
+Per-update timing of database work.
+
+`UpdateTimings` of the update being processed is kept in a context variable, which `sync_to_async` copies
+into the thread running the ORM, so queries can be attributed to the update without passing anything around.
+Tasks that may outlive the update are started with `create_detached_task`, so they aren't attributed to it.
+"""
+
+import asyncio
+import contextvars
+import time
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from asgiref.sync import SyncToAsync, sync_to_async
+from django.db import close_old_connections
+
+if TYPE_CHECKING:
+    from django.db.backends.base.base import BaseDatabaseWrapper
+
+    from bot.schemas.metrics import UpdateStats
+
+ResultType = TypeVar("ResultType")
+
+
+class UpdateTimings:
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+
+        # Thread hop + health check of `close_old_connections`
+        self.connection_time = 0.0
+        # Everything handlers await: queries, but also the schedule backend and the Bot API
+        self.handler_time = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        # Calls to the ORM thread, and how long they waited for the thread to pick them up
+        self.thread_hops = 0
+        self.thread_wait_time = 0.0
+
+    @property
+    def total_time(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "total_time": self.total_time,
+            "connection_time": self.connection_time,
+            "handler_time": self.handler_time,
+            "queries": self.queries,
+            "query_time": self.query_time,
+            "thread_hops": self.thread_hops,
+            "thread_wait_time": self.thread_wait_time,
+        }
+
+    def add_to(self, stats: "UpdateStats") -> None:
+        stats.processing_time += self.total_time
+        stats.connection_time += self.connection_time
+        stats.handler_time += self.handler_time
+        stats.db_queries += self.queries
+        stats.db_time += self.query_time
+        stats.thread_hops += self.thread_hops
+        stats.thread_wait_time += self.thread_wait_time
+
+
+current_timings: ContextVar[UpdateTimings | None] = ContextVar("current_timings", default=None)
+
+
+def create_detached_task(coroutine: Coroutine[Any, Any, ResultType]) -> "asyncio.Task[ResultType]":  # noqa: UP047
+    """Starts a task outside of the update being processed, e.g. one that may still run once it's finished."""
+    context = contextvars.copy_context()
+    context.run(current_timings.set, None)
+
+    return asyncio.create_task(coroutine, context=context)
+
+
+class TimedExecutor(Executor):
+    """
+    Runs calls on the wrapped executor, adding how long each of them waited for its thread to the update.
+
+    Calls are submitted by the coroutine awaiting them, so `current_timings` is the one of their update.
+    """
+
+    def __init__(self, executor: Executor) -> None:
+        self.executor = executor
+
+    def submit(self, fn: Callable[..., ResultType], /, *args: Any, **kwargs: Any) -> Future[ResultType]:  # noqa: ANN401
+        if (timings := current_timings.get()) is None:
+            return self.executor.submit(fn, *args, **kwargs)
+
+        submitted_at = time.perf_counter()
+
+        def timed() -> ResultType:
+            timings.thread_hops += 1
+            timings.thread_wait_time += time.perf_counter() - submitted_at
+
+            return fn(*args, **kwargs)
+
+        return self.executor.submit(timed)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def time_thread_hops() -> None:
+    """
+    Wraps the executor `sync_to_async` (and so the async ORM) uses in the current context into a `TimedExecutor`.
+
+    That is the thread of the current `ThreadSensitiveContext` (every ASGI request has one),
+    or the thread shared by everything outside of one. Calls still run on the same thread,
+    so database connections are used just as before.
+    """
+    thread_sensitive_context = SyncToAsync.thread_sensitive_context.get(None)
+
+    if thread_sensitive_context is None:
+        if not isinstance(SyncToAsync.single_thread_executor, TimedExecutor):
+            SyncToAsync.single_thread_executor = TimedExecutor(SyncToAsync.single_thread_executor)
+
+        return
+
+    executor = SyncToAsync.context_to_thread_executor.get(thread_sensitive_context)
+
+    if not isinstance(executor, TimedExecutor):
+        # Created just as `sync_to_async` would do on its first call in the context
+        SyncToAsync.context_to_thread_executor[thread_sensitive_context] = TimedExecutor(
+            executor or ThreadPoolExecutor(max_workers=1),
+        )
+
+
+async def recycle_connections() -> None:
+    """Closes unusable or expired database connections, what Django does at the start of every request."""
+    started_at = time.perf_counter()
+
+    await sync_to_async(close_old_connections)()
+
+    if (timings := current_timings.get()) is not None:
+        timings.connection_time += time.perf_counter() - started_at
+
+
+def time_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,  # noqa: ANN401
+    many: bool,
+    context: dict,
+) -> Any:  # noqa: ANN401
+    """Database execute wrapper, adding time of each query to the update being processed."""
+    if (timings := current_timings.get()) is None:
+        return execute(sql, params, many, context)
+
+    started_at = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.query_time += time.perf_counter() - started_at
+
+
+def install_query_timer(connection: "BaseDatabaseWrapper") -> None:
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
@@ -1,15 +1,72 @@
+import asyncio
+import time
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
+import pydantic
 from asgiref.sync import async_to_sync
+from student_schedule_bot.config import config
+from student_schedule_bot.logger import main_logger
 from telegram import Bot as TelegramBot
+from telegram.request import HTTPXRequest
 
-from student_schedule_bot.logger import main_logger
+from bot.operations.telegram.bot import get_allowed_updates
+from bot.schemas.base import Schema
 
 if TYPE_CHECKING:
+    from telegram import WebhookInfo
+
     from bot.models.telegram.bot import Bot
 
 
-def set_webhook(bot: "Bot") -> bool:
+async def register_webhook(bot: "Bot", telegram_bot: TelegramBot) -> "WebhookInfo":
+    """Sets the webhook of the bot and returns its state, as Telegram reports it afterwards."""
+    await telegram_bot.set_webhook(
+        url=bot.full_webhook_url,
+        allowed_updates=get_allowed_updates(),
+        max_connections=config.TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+    )
+
+    webhook_info = await telegram_bot.get_webhook_info()
+
+    if webhook_info.url != bot.full_webhook_url or webhook_info.last_error_message:
+        main_logger.warning(
+            {
+                "msg": "Webhook is set, but Telegram reports a problem",
+                "bot.uuid": bot.uuid,
+                "url_matches": webhook_info.url == bot.full_webhook_url,
+                "pending_update_count": webhook_info.pending_update_count,
+                "last_error_date": webhook_info.last_error_date,
+                "last_error_message": webhook_info.last_error_message,
+            }
+        )
+
+    return webhook_info
+
+
+class WebhookResult(Schema):
+    bot_uuid: pydantic.UUID4
+    bot_name: str
+
+    ok: bool = False
+    # Seconds spent on `setWebhook` and `getWebhookInfo`
+    duration: float = 0.0
+
+    pending_update_count: int | None = None
+    last_error_message: str | None = None
+    error: str | None = None
+
+
+async def _set_webhook_with_request(
+    bot: "Bot",
+    request: HTTPXRequest,
+    semaphore: asyncio.Semaphore,
+) -> WebhookResult:
+    result = WebhookResult(
+        bot_uuid=bot.uuid,
+        bot_name=bot.name,
+    )
+
     if not bot.webhook_url:
         main_logger.warning(
             {
@@ -17,18 +74,78 @@ def set_webhook(bot: "Bot") -> bool:
                 "bot.uuid": bot.uuid,
             }
         )
-        return False
+        result.error = "Webhook URL is not set"
+        return result
+
+    async with semaphore:
+        started_at = time.monotonic()
+
+        # Not initialized on purpose: that would call `getMe`, and shutting it down would close the shared request
+        telegram_bot = TelegramBot(
+            token=bot.token,
+            request=request,
+            get_updates_request=request,
+        )
+
+        try:
+            webhook_info = await register_webhook(bot, telegram_bot)
+        except Exception as e:  # noqa: BLE001
+            main_logger.exception(
+                {
+                    "msg": "Failed to set webhook",
+                    "bot.uuid": bot.uuid,
+                    "error": e,
+                }
+            )
+            result.error = str(e) or type(e).__name__
+        else:
+            result.ok = webhook_info.url == bot.full_webhook_url
+            result.pending_update_count = webhook_info.pending_update_count
+            result.last_error_message = webhook_info.last_error_message
+
+            if not result.ok:
+                result.error = "Telegram reports a different webhook URL"
+        finally:
+            result.duration = time.monotonic() - started_at
+
+    return result
+
+
+async def set_webhooks(
+    bots: Sequence["Bot"],
+    concurrency: int,
+) -> list[WebhookResult]:
+    """
+    Sets webhooks of the bots, at most `concurrency` at a time, sharing one connection pool.
+
+    Returns a result per bot, in the same order. Failures are reported in the results, not raised.
+    """
+    request = HTTPXRequest(connection_pool_size=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    await request.initialize()
+
+    try:
+        return list(await asyncio.gather(*(_set_webhook_with_request(bot, request, semaphore) for bot in bots)))
+    finally:
+        await request.shutdown()
+
+
+def get_webhook_info(bot: "Bot") -> "WebhookInfo | None":
+    """Returns the current state of the webhook, or `None` if Telegram couldn't be asked."""
+
+    async def _get_webhook_info() -> "WebhookInfo":
+        async with TelegramBot(token=bot.token) as telegram_bot:
+            return await telegram_bot.get_webhook_info()
 
     try:
-        telegram_bot = TelegramBot(token=bot.token)
-        async_to_sync(telegram_bot.set_webhook)(url=bot.full_webhook_url)
-        return True
+        return async_to_sync(_get_webhook_info)()
     except Exception as e:  # noqa: BLE001
-        main_logger.exception(
+        main_logger.warning(
             {
-                "msg": "Failed to set webhook",
+                "msg": "Failed to get webhook info",
                 "bot.uuid": bot.uuid,
                 "error": e,
             }
         )
-        return False
+        return None
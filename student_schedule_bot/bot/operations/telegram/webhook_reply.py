@@ -0,0 +1,120 @@
+"""
+Bot API calls answered in the webhook response.
+
+Telegram executes a method call returned as the body of the webhook response, which saves a round trip.
+Its result is never known, so only methods whose result we don't need (`answerCallbackQuery`) are eligible,
+and only the first of them in an update - the rest are sent as usual.
+
+The response goes out only once the handler has finished (e.g. after fetching the schedule), while the button
+shows a spinner until its callback query is answered. So the call is sent on its own if the handler is still
+running after `TELEGRAM_WEBHOOK_REPLY_MAX_DELAY` seconds.
+"""
+
+import asyncio
+import functools
+import json
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from student_schedule_bot.logger import main_logger
+from telegram.request import HTTPXRequest
+
+from bot.operations.telegram.timings import create_detached_task
+
+if TYPE_CHECKING:
+    from telegram.request import RequestData
+
+ELIGIBLE_METHODS = frozenset({"answerCallbackQuery"})
+
+# What Telegram would have answered to the eligible methods
+OK_RESPONSE = json.dumps({"ok": True, "result": True}).encode()
+
+# Same as the default of `ApplicationBuilder`
+CONNECTION_POOL_SIZE = 256
+
+
+class WebhookReply:
+    """Holds the call to return in the webhook response of the update being processed, for up to `max_delay` seconds."""
+
+    def __init__(self, max_delay: float) -> None:
+        self.max_delay = max_delay
+
+        self.call: dict[str, Any] | None = None
+        # Only the first eligible call is held, even if it had to be sent on its own
+        self.held = False
+
+        self._timer: asyncio.Task | None = None
+
+    def hold(self, call: dict[str, Any], send: Callable[[], Coroutine[Any, Any, tuple[int, bytes]]]) -> None:
+        self.call = call
+        self.held = True
+        self._timer = create_detached_task(self._send_later(send))
+
+    def take(self) -> dict[str, Any] | None:
+        """Returns the call for the webhook response, unless it was already sent on its own."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        return self.call
+
+    async def _send_later(self, send: Callable[[], Coroutine[Any, Any, tuple[int, bytes]]]) -> None:
+        await asyncio.sleep(self.max_delay)
+
+        # Can't be cancelled by `take` from now on, the webhook response stays empty
+        call, self.call, self._timer = self.call, None, None
+
+        try:
+            status_code, _ = await send()
+        except Exception as e:  # noqa: BLE001
+            main_logger.exception(
+                {
+                    "msg": "Failed to send delayed webhook reply",
+                    "call": call,
+                    "error": e,
+                }
+            )
+            return
+
+        if status_code != HTTPStatus.OK:
+            main_logger.warning(
+                {
+                    "msg": "Delayed webhook reply was rejected",
+                    "call": call,
+                    "status_code": status_code,
+                }
+            )
+
+
+current_webhook_reply: ContextVar[WebhookReply | None] = ContextVar("current_webhook_reply", default=None)
+
+
+class WebhookReplyRequest(HTTPXRequest):
+    """Holds the first eligible call in `current_webhook_reply` (if set) instead of sending it right away."""
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: "RequestData | None" = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> tuple[int, bytes]:
+        reply = current_webhook_reply.get()
+
+        if reply is not None and not reply.held and request_data is not None and not request_data.contains_files:
+            endpoint = url.rsplit("/", 1)[-1]
+
+            if endpoint in ELIGIBLE_METHODS:
+                reply.hold(
+                    {
+                        "method": endpoint,
+                        **request_data.parameters,
+                    },
+                    functools.partial(super().do_request, url, method, request_data, **kwargs),
+                )
+
+                return HTTPStatus.OK, OK_RESPONSE
+
+        return await super().do_request(url, method, request_data, **kwargs)
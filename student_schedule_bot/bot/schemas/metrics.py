@@ -0,0 +1,55 @@
+from bot.schemas.base import Schema
+
+
+class UpdateQueueStats(Schema):
+    workers: int = 0
+    depth: int = 0
+    capacity: int = 0
+
+    enqueued: int = 0
+    processed: int = 0
+    failed: int = 0
+    rejected: int = 0
+
+    # Seconds between enqueueing an update and starting to process it
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+
+
+class UpdateStats(Schema):
+    processed: int = 0
+    # Redeliveries of updates that were already handled
+    duplicates: int = 0
+    # Updates of types no handler reacts to, dropped without processing
+    ignored: int = 0
+    # Updates answered with a Bot API call in the webhook response
+    webhook_replies: int = 0
+
+    # Totals in seconds, `connection_time` is spent on recycling database connections,
+    # `handler_time` includes queries as well as schedule backend and Bot API calls
+    processing_time: float = 0.0
+    connection_time: float = 0.0
+    handler_time: float = 0.0
+    db_queries: int = 0
+    db_time: float = 0.0
+    # Calls to the thread running the ORM, and the time they waited before it picked them up
+    thread_hops: int = 0
+    thread_wait_time: float = 0.0
+
+
+class RateLimitStats(Schema):
+    # Requests to the Bot API, of every bot
+    requests: int = 0
+    delayed: int = 0
+    wait_time: float = 0.0
+
+    retry_after: int = 0
+    retries: int = 0
+
+
+class MetricsResponse(Schema):
+    updates: UpdateStats
+    update_queue: UpdateQueueStats
+    schedule_cache: dict[str, dict[str, float]]
+    render_cache: dict[str, int]
+    rate_limit: RateLimitStats
@@ -0,0 +1,40 @@
+from asgiref.sync import async_to_sync
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bot.dependencies.telegram import bot_cache
+from bot.models.telegram.bot import Bot
+from bot.operations.telegram.bot import application_registry
+from bot.operations.telegram.timings import install_query_timer
+
+
+@receiver(post_save, sender=Bot)
+@receiver(post_delete, sender=Bot)
+def invalidate_bot_cache(
+    sender: type[Bot],  # noqa: ARG001
+    instance: Bot,
+    **kwargs: object,  # noqa: ARG001
+) -> None:
+    bot_cache.invalidate(instance.uuid)
+
+
+@receiver(post_delete, sender=Bot)
+def discard_application(
+    sender: type[Bot],  # noqa: ARG001
+    instance: Bot,
+    **kwargs: object,  # noqa: ARG001
+) -> None:
+    # Stops the Application (with its persistence and connection pool) of a deleted bot,
+    # on the event loop it runs on, as deletes come from sync code (e.g. the admin)
+    async_to_sync(application_registry.discard)(str(instance.uuid))
+
+
+@receiver(connection_created)
+def time_queries(
+    sender: type[BaseDatabaseWrapper],  # noqa: ARG001
+    connection: BaseDatabaseWrapper,
+    **kwargs: object,  # noqa: ARG001
+) -> None:
+    install_query_timer(connection)
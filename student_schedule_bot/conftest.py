@@ -0,0 +1,106 @@
+# ruff: noqa: INP001 - the project root is the import root, not a package
+
+import dataclasses
+import os
+import time
+import timeit
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+import django
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "student_schedule_bot.settings.local")
+
+django.setup()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    # Tests share the process-local cache, so every test starts with an empty one
+    from django.core.cache import cache  # noqa: PLC0415
+
+    cache.clear()
+
+
+@pytest.fixture(scope="session")
+def django_db() -> Iterator[None]:
+    """Creates a migrated test database (in memory with SQLite) for the tests that use it, once per session."""
+    from django.db import connection  # noqa: PLC0415
+
+    database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    yield
+
+    connection.creation.destroy_test_db(database_name, verbosity=0)
+
+
+@dataclasses.dataclass(frozen=True)
+class Measurement:
+    name: str
+    value: float
+    unit: str
+
+
+measurements_key = pytest.StashKey[list[Measurement]]()
+
+
+class Benchmark:
+    """
+    Measures code of `bench_*` modules, the results are listed in the terminal summary.
+
+    Timings are the best of `repeat` rounds of `number` calls, per call, so they are comparable between runs.
+    """
+
+    def __init__(self, measurements: list[Measurement]) -> None:
+        self.measurements = measurements
+
+    def report(self, name: str, value: float, unit: str) -> None:
+        self.measurements.append(Measurement(name, value, unit))
+
+    def measure(self, name: str, func: Callable[[], Any], *, number: int = 1000, repeat: int = 5) -> float:
+        """Returns the time per call of `func`, in seconds."""
+        return self._report_time(name, min(timeit.repeat(func, number=number, repeat=repeat)) / number)
+
+    async def measure_async(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        *,
+        number: int = 100,
+        repeat: int = 5,
+    ) -> float:
+        """Returns the time per call of the coroutine function `func`, in seconds."""
+        rounds = []
+
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+
+            for _ in range(number):
+                await func()
+
+            rounds.append(time.perf_counter() - started_at)
+
+        return self._report_time(name, min(rounds) / number)
+
+    def _report_time(self, name: str, seconds: float) -> float:
+        self.report(name, seconds * 1_000_000, "us")
+        return seconds
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Benchmark:
+    return Benchmark(request.config.stash.setdefault(measurements_key, []))
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter, config: pytest.Config) -> None:
+    measurements = config.stash.get(measurements_key, [])
+
+    if not measurements:
+        return
+
+    terminalreporter.section("benchmarks")
+
+    for measurement in measurements:
+        value = str(measurement.value) if isinstance(measurement.value, int) else f"{measurement.value:.2f}"
+        terminalreporter.write_line(f"{measurement.name:<70} {value:>12} {measurement.unit}")
@@ -6,7 +6,9 @@ Unused imports are kept for compatibility with the original code.
 For example, you don't need to import httpx's Auth, because it can be accessed via single import.
 """
 
-from collections.abc import Callable
+import asyncio
+import weakref
+from collections.abc import AsyncGenerator, Callable
 from importlib import metadata
 from typing import Any, Literal
 
@@ -14,7 +16,7 @@ import httpx
 import pydantic
 from httpx._auth import Auth  # noqa: F401
 from httpx._client import USE_CLIENT_DEFAULT, UseClientDefault
-from httpx._config import Proxy, Timeout  # noqa: F401
+from httpx._config import Limits, Proxy, Timeout  # noqa: F401
 from httpx._models import Cookies, Headers, Request  # noqa: F401
 from httpx._types import (
     AuthTypes,
@@ -57,21 +59,35 @@ class RequestSender:
 
     Attempts to reuse the same client for multiple requests,
     but if the client is not available, it will create a new one.
+    Async clients are stored per service name and per event loop,
+    as an httpx.AsyncClient can't be shared between loops.
+    They are closed when their loop shuts down, or by `aclose_all`.
 
     Parameters
     - service_name (str, no-arg method that returns str): The name of the service to send requests from
     - base_url (str, None): Optional base URL to send requests to.
+    - limits (httpx.Limits, None): Optional connection pool limits (max connections, keep-alive).
+    - http2 (bool): Whether to enable HTTP/2.
     """
 
     __client_storage: dict[str, httpx.Client] = {}
+    __async_client_storage: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = (
+        weakref.WeakKeyDictionary()
+    )
+    __loop_closers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGenerator[None]]" = (
+        weakref.WeakKeyDictionary()
+    )
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self: "RequestSender",
         service_name: str | Callable[..., str] = "Undefined",
         base_url: str | None = None,
         timeout: Timeout = Timeout(timeout=30.0),  # noqa: B008
         verify: bool = True,
         client_kwargs: dict[str, Any] | None = None,
+        *,
+        limits: Limits | None = None,
+        http2: bool = False,
     ) -> None:
         if callable(service_name):
             service_name = service_name()
@@ -82,6 +98,10 @@ class RequestSender:
             "timeout": timeout,
             "verify": verify,
         }
+        if limits is not None:
+            self.additional_args["limits"] = limits
+        if http2:
+            self.additional_args["http2"] = http2
         if client_kwargs is not None:
             self.additional_args.update(client_kwargs)
 
@@ -130,7 +150,7 @@ class RequestSender:
         """
         params = params or HttpxRequestParameters()
 
-        client = self.__get_async_client(
+        client = await self.__get_async_client(
             service_name=self.service_name,
             additional_args=self.additional_args,
         )
@@ -190,22 +210,80 @@ class RequestSender:
         return cls.__client_storage[service_name]
 
     @classmethod
-    def __get_async_client(
+    async def __get_async_client(
         cls: type["RequestSender"],
         service_name: str,
         additional_args: dict[str, Any] | None = None,
     ) -> httpx.AsyncClient:
         """
-        Returns an async client for the given service name.
+        Returns an async client for the given service name, bound to the running event loop.
         You can define default timeout for the requests, which is set to 30 seconds by default.
         """
         if additional_args is None:
             additional_args = {}
 
-        return httpx.AsyncClient(
+        loop = asyncio.get_running_loop()
+        loop_clients = cls.__async_client_storage.get(loop)
+
+        if loop_clients is None:
+            loop_clients = cls.__async_client_storage[loop] = {}
+
+            closer = cls.__close_on_loop_shutdown(loop)
+            await anext(closer)
+            cls.__loop_closers[loop] = closer
+
+        if (client := loop_clients.get(service_name)) and not client.is_closed:
+            return client
+
+        loop_clients[service_name] = httpx.AsyncClient(
             headers=cls._make_headers(
                 service_name=service_name,
                 request_method="async",
             ),
             **additional_args,
         )
+
+        return loop_clients[service_name]
+
+    @classmethod
+    async def __close_loop_clients(
+        cls: type["RequestSender"],
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        cls.__loop_closers.pop(loop, None)
+
+        for client in cls.__async_client_storage.pop(loop, {}).values():
+            await client.aclose()
+
+    @classmethod
+    async def __close_on_loop_shutdown(
+        cls: type["RequestSender"],
+        loop: asyncio.AbstractEventLoop,
+    ) -> AsyncGenerator[None]:
+        """
+        Closes the clients of an event loop when the loop shuts down.
+
+        `asyncio.run` (and so `async_to_sync`) closes the async generators of a loop before closing the loop,
+        so this one stays suspended for the lifetime of the loop and closes the clients on the way out.
+        """
+        try:
+            yield
+        finally:
+            await cls.__close_loop_clients(loop)
+
+    @classmethod
+    async def aclose_all(
+        cls: type["RequestSender"],
+    ) -> None:
+        """
+        ! Async method !
+        Closes every stored async client.
+        Clients of event loops running in other threads are closed on their loops.
+        """
+        running_loop = asyncio.get_running_loop()
+
+        for loop in list(cls.__async_client_storage):
+            if loop is running_loop:
+                await cls.__close_loop_clients(loop)
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(cls.__close_loop_clients(loop), loop))
@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING
+
+import pytest
+
+from libs.requests.sender import Limits, RequestSender
+
+if TYPE_CHECKING:
+    from conftest import Benchmark
+
+REQUESTS = 200
+CONCURRENCY = 20
+MAX_CONNECTIONS = 4
+
+
+class StubServer:
+    """HTTP/1.1 server with keep-alive, running on its own event loop in a thread and counting connections."""
+
+    def __init__(self) -> None:
+        self.opened = 0
+        self.closed = 0
+        self.requests = 0
+        self.port = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def wait_for(self, condition: Callable[[], bool], timeout: float = 5) -> bool:
+        deadline = time.monotonic() + timeout
+
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+
+            time.sleep(0.01)
+
+        return True
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+
+        self._loop.run_forever()
+        server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.opened += 1
+
+        try:
+            while await reader.readline():
+                # Requests of the sender have no body, so the headers are all there is to read
+                while await reader.readline() not in {b"\r\n", b""}:
+                    pass
+
+                self.requests += 1
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok")
+                await writer.drain()
+        finally:
+            self.closed += 1
+            writer.close()
+
+
+@pytest.fixture
+def server() -> Iterator[StubServer]:
+    server = StubServer()
+    server.start()
+
+    yield server
+
+    server.stop()
+
+
+def make_sender(server: StubServer, service_name: str) -> RequestSender:
+    return RequestSender(
+        service_name,
+        base_url=server.url,
+        limits=Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_CONNECTIONS,
+        ),
+    )
+
+
+def test_requests_reuse_connections(server: StubServer, benchmark: "Benchmark") -> None:
+    sender = make_sender(server, "test_reuse")
+
+    async def run() -> float:
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def send() -> None:
+            async with semaphore:
+                response = await sender.send_async("GET", "/")
+                assert response.text == "ok"
+
+        started_at = time.perf_counter()
+
+        await sender.send_async("GET", "/")
+        await sender.send_async("GET", "/")
+        # Sequential requests go through the same connection
+        assert server.opened == 1
+
+        await asyncio.gather(*(send() for _ in range(REQUESTS)))
+        duration = time.perf_counter() - started_at
+
+        await RequestSender.aclose_all()
+        return duration
+
+    duration = asyncio.run(run())
+
+    assert server.requests == REQUESTS + 2
+    # Concurrent requests never open more connections than the pool allows
+    assert server.opened <= MAX_CONNECTIONS
+    assert server.wait_for(lambda: server.closed == server.opened)
+
+    benchmark.report("sender: requests through a pooled client", REQUESTS / duration, "req/s")
+
+
+def test_aclose_all_closes_clients(server: StubServer) -> None:
+    first, second = make_sender(server, "test_first"), make_sender(server, "test_second")
+
+    async def run() -> None:
+        await first.send_async("GET", "/")
+        await second.send_async("GET", "/")
+
+        assert server.opened == 2  # noqa: PLR2004
+        assert server.closed == 0
+
+        await RequestSender.aclose_all()
+        assert server.wait_for(lambda: server.closed == 2)  # noqa: PLR2004
+
+        # A closed client isn't reused, a new one is created
+        await first.send_async("GET", "/")
+        assert server.opened == 3  # noqa: PLR2004
+
+        await RequestSender.aclose_all()
+
+    asyncio.run(run())
+
+    assert server.wait_for(lambda: server.closed == server.opened)
+
+
+def test_clients_are_closed_with_their_loop(server: StubServer) -> None:
+    sender = make_sender(server, "test_loop")
+
+    async def run() -> None:
+        await sender.send_async("GET", "/")
+
+    # Every `asyncio.run` (as every `async_to_sync` call) has a loop of its own, which goes away afterwards
+    for _ in range(3):
+        asyncio.run(run())
+
+    assert server.opened == 3  # noqa: PLR2004
+    assert server.wait_for(lambda: server.closed == server.opened)
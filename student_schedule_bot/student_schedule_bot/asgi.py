@@ -11,6 +11,28 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from student_schedule_bot.config import config
+from student_schedule_bot.lifespan import LifespanApplication, register_shutdown, register_startup
+from student_schedule_bot.routing import PrefixRouter, WebhookASGIHandler
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "student_schedule_bot.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+if config.WEBHOOK_LEAN_ASGI:
+    # Webhooks skip the middleware, the admin stays on the regular stack
+    django_application = PrefixRouter(
+        default=django_application,
+        routes={
+            "/api/webhook/telegram/": WebhookASGIHandler(),
+        },
+    )
+
+application = LifespanApplication(django_application)
+
+# Apps have to be loaded before importing anything that uses models
+from bot.operations.schedule.warmup import periodic_warmup  # noqa: E402
+
+if config.SCHEDULE_WARMUP_ENABLED:
+    register_startup(periodic_warmup.start)
+    register_shutdown(periodic_warmup.stop)
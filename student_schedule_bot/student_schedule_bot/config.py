@@ -1,5 +1,5 @@
 from collections.abc import Callable
-from typing import Annotated
+from typing import Annotated, Literal
 
 import pydantic
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,15 +23,77 @@ class Config(BaseSettings):
     DEBUG: bool = False
     SECRET_KEY: str = "SecretToken-YUot2-hEjkK1uV3sjUZ3Pg"
     ADMIN_CHAT_ID: str | None = None
+    # Errors are reported to the admin chat as one digest per this many seconds
+    ADMIN_ERROR_DIGEST_WINDOW: int = 60
     ALLOWED_HOSTS: StringListValidator = ["*"]
     TRUSTED_HOSTS: StringListValidator = ["http://localhost", "https://localhost"]
 
     DATABASE_CONNECTION: pydantic.AnyUrl = "sqlite:///db.sqlite3"
+    # Connection pool of PostgreSQL (requires `psycopg[pool]`), persistent connections are used otherwise
+    DATABASE_POOL: bool = False
+    DATABASE_POOL_MIN_SIZE: int = 2
+    DATABASE_POOL_MAX_SIZE: int = 10
+    DATABASE_POOL_TIMEOUT: float = 10.0
 
     TIMEZONE: str = "UTC"
     LANGUAGE_CODE: str = "en-us"
 
     SCHEDULE_URL: pydantic.HttpUrl = "http://student-schedule-backend-1:8000/api"
+    # Connection pool of the schedule backend client
+    SCHEDULE_MAX_CONNECTIONS: int = 100
+    SCHEDULE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SCHEDULE_KEEPALIVE_EXPIRY: float = 30.0
+    SCHEDULE_HTTP2: bool = False
+    # Schedule cache, all values are in seconds
+    SCHEDULE_LIST_CACHE_TTL: int = 60 * 5
+    SCHEDULE_ITEM_CACHE_TTL: int = 60 * 5
+    SCHEDULE_PHOTO_CACHE_TTL: int = 60 * 5
+    # How long expired entries may still be served, while refreshing or when the backend is down
+    SCHEDULE_CACHE_MAX_STALE: int = 60 * 60
+    SCHEDULE_NEGATIVE_CACHE_TTL: int = 30
+    SCHEDULE_STALE_WHILE_REVALIDATE: bool = True
+    SCHEDULE_CACHE_COMPRESSION: bool = True
+    # Warm-up of the schedule cache (in the web process if enabled, or by the `warm_schedule_cache` command)
+    SCHEDULE_WARMUP_ENABLED: bool = False
+    SCHEDULE_WARMUP_DAYS: int = 7
+    SCHEDULE_WARMUP_MAX_PAGES: int = 5
+    SCHEDULE_WARMUP_CONCURRENCY: int = 4
+    SCHEDULE_WARMUP_INTERVAL: int = 60 * 4
+
+    # Where python-telegram-bot stores chat/user/callback data
+    TELEGRAM_PERSISTENCE: Literal["database", "redis", "pickle"] = "database"
+    REDIS_URL: pydantic.AnyUrl | None = None
+    # Serve webhooks by a Django handler without middleware
+    WEBHOOK_LEAN_ASGI: bool = True
+    # Acknowledge webhooks right away and process updates on background workers
+    TELEGRAM_UPDATE_QUEUE_ENABLED: bool = False
+    TELEGRAM_UPDATE_WORKERS: int = 8
+    # Per worker, webhooks are answered with 503 once the queue is full
+    TELEGRAM_UPDATE_QUEUE_SIZE: int = 100
+    TELEGRAM_UPDATE_QUEUE_SHUTDOWN_TIMEOUT: float = 10.0
+    # How many webhook requests Telegram sends at once (1-100, Telegram's default is 40)
+    TELEGRAM_WEBHOOK_MAX_CONNECTIONS: int = 100
+    # How many bots get their webhooks set at once by the admin action and the `set_webhooks` command
+    TELEGRAM_WEBHOOK_REGISTRATION_CONCURRENCY: int = 10
+    # For how long (in seconds) a callback query answer waits for the webhook response before it's sent on its own,
+    # the response only goes out once the handler has finished, 0 disables answers in the response
+    TELEGRAM_WEBHOOK_REPLY_MAX_DELAY: float = 0.3
+    # For how long (in seconds) redeliveries of an already handled update are ignored, 0 disables it
+    TELEGRAM_UPDATE_DEDUP_WINDOW: int = 60 * 10
+    # For how long (in seconds) bot credentials are cached by the webhook, 0 disables it
+    TELEGRAM_BOT_CACHE_TTL: int = 60
+    # For how long (in seconds) users are cached by chat, so button taps don't query the database
+    TELEGRAM_USER_CACHE_TTL: int = 60
+    # How many rendered schedule pages and items are kept in memory, 0 disables it
+    TELEGRAM_RENDER_CACHE_SIZE: int = 256
+    # Rate limiting of messages sent to chats, rates are per second and bursts are in messages
+    TELEGRAM_RATE_LIMIT_ENABLED: bool = True
+    TELEGRAM_GLOBAL_RATE: float = 30
+    TELEGRAM_CHAT_RATE: float = 1
+    TELEGRAM_CHAT_BURST: float = 3
+    TELEGRAM_GROUP_RATE: float = 20 / 60
+    TELEGRAM_GROUP_BURST: float = 3
+    TELEGRAM_RATE_LIMIT_MAX_RETRIES: int = 2
 
     model_config = SettingsConfigDict(
         env_file=(
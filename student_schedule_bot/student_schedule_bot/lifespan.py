@@ -0,0 +1,93 @@
+"""
+ASGI lifespan support.
+
+Django's ASGI handler only speaks HTTP, so long-lived resources (Telegram applications, HTTP clients,
+background tasks) register their setup/cleanup here and the wrapper below runs it when the server starts/stops.
+"""
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from student_schedule_bot.logger import main_logger
+
+LifespanCallback = Callable[[], Awaitable[Any]]
+
+_startup_callbacks: list[LifespanCallback] = []
+_shutdown_callbacks: list[LifespanCallback] = []
+
+
+def register_startup(callback: LifespanCallback) -> LifespanCallback:
+    """Registers a coroutine function to be awaited on ASGI lifespan startup."""
+    if callback not in _startup_callbacks:
+        _startup_callbacks.append(callback)
+
+    return callback
+
+
+def register_shutdown(callback: LifespanCallback) -> LifespanCallback:
+    """Registers a coroutine function to be awaited on ASGI lifespan shutdown."""
+    if callback not in _shutdown_callbacks:
+        _shutdown_callbacks.append(callback)
+
+    return callback
+
+
+async def run_startup() -> None:
+    """Awaits every registered startup callback, in registration order."""
+    for callback in _startup_callbacks:
+        await callback()
+
+
+async def run_shutdown() -> None:
+    """Awaits every registered shutdown callback, in reverse registration order."""
+    for callback in reversed(_shutdown_callbacks):
+        try:
+            await callback()
+        except Exception as e:  # noqa: BLE001
+            main_logger.exception(
+                {
+                    "msg": "Shutdown callback failed",
+                    "callback": callback,
+                    "error": e,
+                }
+            )
+
+
+class LifespanApplication:
+    """Wraps an ASGI application, answering lifespan events itself and passing everything else through."""
+
+    def __init__(self, application: Callable[..., Awaitable[None]]) -> None:
+        self.application = application
+
+    async def __call__(
+        self,
+        scope: dict,
+        receive: Callable[[], Awaitable[dict]],
+        send: Callable[[dict], Awaitable[None]],
+    ) -> None:
+        if scope["type"] != "lifespan":
+            await self.application(scope, receive, send)
+            return
+
+        while True:
+            message = await receive()
+
+            match message["type"]:
+                case "lifespan.startup":
+                    try:
+                        await run_startup()
+                    except Exception as e:  # noqa: BLE001
+                        main_logger.exception(
+                            {
+                                "msg": "Startup callback failed",
+                                "error": e,
+                            }
+                        )
+                        await send({"type": "lifespan.startup.failed", "message": repr(e)})
+                        return
+
+                    await send({"type": "lifespan.startup.complete"})
+                case "lifespan.shutdown":
+                    await run_shutdown()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
@@ -0,0 +1,69 @@
+"""
+ASGI routing between the regular Django stack and the lean webhook handler.
+
+Telegram webhooks need none of the admin-oriented middleware (sessions, CSRF, auth, messages, clickjacking),
+and each of them switches to a thread and back for every request, so webhooks skip them.
+"""
+
+from collections.abc import Awaitable, Callable
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import HttpRequest, HttpResponse
+
+ASGIApplication = Callable[[dict, Callable[[], Awaitable[dict]], Callable[[dict], Awaitable[None]]], Awaitable[None]]
+
+
+class WebhookASGIHandler(ASGIHandler):
+    """
+    Django's ASGI handler without any middleware, so requests are handled without leaving the event loop.
+
+    URL resolution, request signals (and so recycling of database connections) and exception handling
+    work as usual. Hosts are still checked against `ALLOWED_HOSTS`, as `CommonMiddleware` would do.
+    """
+
+    def load_middleware(self, is_async: bool = False) -> None:
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        self._middleware_chain = convert_exception_to_response(
+            self._get_validated_response_async if is_async else self._get_validated_response
+        )
+
+    async def _get_validated_response_async(self, request: HttpRequest) -> HttpResponse:
+        # Raises `DisallowedHost`, which is turned into a 400 response
+        request.get_host()
+        return await self._get_response_async(request)
+
+    def _get_validated_response(self, request: HttpRequest) -> HttpResponse:
+        request.get_host()
+        return self._get_response(request)
+
+
+class PrefixRouter:
+    """Passes HTTP requests with a path starting with one of `routes` to its application, others to `default`."""
+
+    def __init__(
+        self,
+        default: ASGIApplication,
+        routes: dict[str, ASGIApplication],
+    ) -> None:
+        self.default = default
+        self.routes = routes
+
+    async def __call__(
+        self,
+        scope: dict,
+        receive: Callable[[], Awaitable[dict]],
+        send: Callable[[dict], Awaitable[None]],
+    ) -> None:
+        if scope["type"] == "http":
+            path = scope["path"]
+
+            for prefix, application in self.routes.items():
+                if path.startswith(prefix):
+                    await application(scope, receive, send)
+                    return
+
+        await self.default(scope, receive, send)
@@ -90,6 +90,18 @@ DATABASES = {
     )
 }
 
+if config.DATABASE_POOL:
+    # Django doesn't support persistent connections together with the pool
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        **DATABASES["default"].get("OPTIONS", {}),
+        "pool": {
+            "min_size": config.DATABASE_POOL_MIN_SIZE,
+            "max_size": config.DATABASE_POOL_MAX_SIZE,
+            "timeout": config.DATABASE_POOL_TIMEOUT,
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,21 @@
+import asyncio
+
+import httpx
+from django.test import override_settings
+
+from student_schedule_bot.routing import WebhookASGIHandler
+
+
+async def get_status(host: str) -> int:
+    transport = httpx.ASGITransport(app=WebhookASGIHandler())
+
+    async with httpx.AsyncClient(transport=transport, base_url=f"http://{host}") as client:
+        response = await client.post("/api/webhook/telegram/unknown/", content=b"{}")
+
+    return response.status_code
+
+
+@override_settings(ALLOWED_HOSTS=["bot.example.com"])
+def test_disallowed_host_is_rejected() -> None:
+    assert asyncio.run(get_status("evil.example.com")) == httpx.codes.BAD_REQUEST
+    assert asyncio.run(get_status("bot.example.com")) == httpx.codes.NOT_FOUND